@@ -0,0 +1,213 @@
+import os
+import sys
+import time
+import asyncio
+from bisect import bisect_left
+from itertools import islice
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Clip, User, BlockedClips
+from app.utils.time_tracking_logger import logger
+
+
+class ClipCatalogConfig:
+    ENABLED = os.getenv("CLIP_CATALOG_ENABLED", "true").lower() == "true"
+    # Likes und Blockierungen aus anderen Workern sind spätestens nach so vielen Sekunden sichtbar
+    MAX_AGE = int(os.getenv("CLIP_CATALOG_MAX_AGE", "60"))
+
+
+# Speicherbedarf pro Clip (siehe ClipRecord) und pro Clip und genutzter Sortierung
+BYTES_PER_CLIP = 450
+BYTES_PER_SORT = 80
+
+
+class ClipRecord:
+    """
+    Ein Clip im Katalog. Durch __slots__ ohne __dict__ belegt ein Record
+    96 Bytes (CPython 3.13, 64 Bit), dazu clip_id (~80 Bytes), Thumbnail-URL
+    (~120 Bytes), datetime (48 Bytes) und die Einträge in den beiden
+    Lookup-Dicts (~60 Bytes); Erstellernamen teilen sich alle Clips eines
+    Erstellers. Zusammen höchstens BYTES_PER_CLIP (450) Bytes pro Clip, jede
+    genutzte Sortierung kostet bis zu BYTES_PER_SORT (80) weitere. Bei 50k
+    Clips und allen drei Sortierungen also etwa 35 MB; der gemessene Wert
+    steht in ClipCatalog.stats() und wird in tests/test_clip_catalog.py geprüft.
+    """
+
+    __slots__ = ("id", "clip_id", "creator_name", "view_count", "created_at", "likes", "thumbnail_url", "blocked")
+
+    def __init__(self, id: int, clip_id: str, creator_name: str, view_count: int, created_at: datetime,
+                 likes: int, thumbnail_url: str | None, blocked: bool):
+        self.id = id
+        self.clip_id = clip_id
+        self.creator_name = creator_name
+        self.view_count = view_count or 0
+        self.created_at = created_at
+        self.likes = likes or 0
+        self.thumbnail_url = thumbnail_url
+        self.blocked = blocked
+
+    def to_dict(self, show_blocked: bool) -> dict:
+        return {
+            "id": self.clip_id,
+            "creator_name": self.creator_name,
+            "view_count": self.view_count,
+            "created_at": self.created_at.isoformat(),
+            "likes": self.likes,
+            "thumbnail_url": self.thumbnail_url,
+            # None, wenn blockierte Clips nicht angezeigt werden
+            "blocked": self.blocked if show_blocked else None,
+        }
+
+
+class ClipCatalog:
+    """
+    Lesekatalog aller Clips für /clip/all.
+
+    Wird beim Start einmal geladen und danach von Likes und Blockierungen
+    direkt angepasst; nach einem Sync wird neu geladen. Filtern, Sortieren
+    und Blättern laufen ohne Datenbank auf sortierten Schlüssellisten
+    (Spalte, id); ein Like verschiebt nur den betroffenen Eintrag.
+    """
+
+    def __init__(self):
+        self.records: dict[int, ClipRecord] = {}
+        self.by_clip_id: dict[str, ClipRecord] = {}
+        # sort -> (aufsteigende Schlüssel (Wert, id), Records in gleicher Reihenfolge)
+        self.orders: dict[str, tuple[list[tuple], list[ClipRecord]]] = {}
+        self.loaded_at: float | None = None
+        self.stale = True
+        self.load_lock = asyncio.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        return (
+            not self.stale
+            and self.loaded_at is not None
+            and time.monotonic() - self.loaded_at < ClipCatalogConfig.MAX_AGE
+        )
+
+    async def load(self, db: AsyncSession):
+        started = time.perf_counter()
+        blocked = (
+            select(BlockedClips.id)
+            .where(BlockedClips.clip_id == Clip.id, BlockedClips.status == True)
+            .exists()
+        )
+        rows = (await db.execute(
+            select(
+                Clip.id,
+                Clip.clip_id,
+                User.display_name,
+                Clip.view_count,
+                Clip.created_at,
+                Clip.likes,
+                Clip.thumbnail_url,
+                blocked,
+            ).join(User, Clip.creator_id == User.id)
+        )).all()
+
+        # Ein String pro Ersteller statt einem pro Clip
+        names: dict[str, str] = {}
+        records = {
+            row[0]: ClipRecord(row[0], row[1], names.setdefault(row[2], row[2]), *row[3:])
+            for row in rows
+        }
+        self.records = records
+        self.by_clip_id = {record.clip_id: record for record in records.values()}
+        self.orders = {}
+        self.loaded_at = time.monotonic()
+        self.stale = False
+        logger.info(f"Clip-Katalog geladen: {len(records)} Clips in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self.fresh:
+            return
+        # Läuft MAX_AGE ab, lädt nur eine Anfrage neu; die anderen warten darauf
+        async with self.load_lock:
+            if not self.fresh:
+                await self.load(db)
+
+    def invalidate(self):
+        """Nach einem Sync: beim nächsten Abruf neu laden."""
+        self.stale = True
+
+    def set_likes(self, clip_id: str, likes: int):
+        record = self.by_clip_id.get(clip_id)
+        if record is None or record.likes == likes:
+            return
+        order = self.orders.get("likes")
+        if order is not None:
+            # Nur diesen Record in der Sortierung verschieben statt alles neu zu sortieren
+            keys, records = order
+            index = bisect_left(keys, (record.likes, record.id))
+            del keys[index], records[index]
+            index = bisect_left(keys, (likes, record.id))
+            keys.insert(index, (likes, record.id))
+            records.insert(index, record)
+        record.likes = likes
+
+    def set_blocked(self, clip_db_id: int, blocked: bool):
+        # Filter statt Sortierung: die Reihenfolgen bleiben gültig
+        record = self.records.get(clip_db_id)
+        if record is not None:
+            record.blocked = blocked
+
+    def order(self, sort: str) -> tuple[list[tuple], list[ClipRecord]]:
+        if sort not in self.orders:
+            records = sorted(self.records.values(), key=lambda record: (getattr(record, sort), record.id))
+            self.orders[sort] = ([(getattr(record, sort), record.id) for record in records], records)
+        return self.orders[sort]
+
+    def list(self, show_blocked: bool, sort: str | None, limit: int | None = None,
+             after: tuple | None = None) -> tuple[list[ClipRecord], ClipRecord | None]:
+        """
+        Clips absteigend nach (sort, id), ab dem Schlüssel after (exklusiv).
+
+        Returns:
+            tuple[list[ClipRecord], ClipRecord | None]: Seite und letzter
+            Record, falls weitere folgen (für den nächsten Cursor).
+        """
+        if sort is None and limit is None:
+            # Ohne Sortierung wie bisher in Reihenfolge der Datenbank-ID
+            source = iter(self.records.values())
+        else:
+            keys, records = self.order(sort or "created_at")
+            end = bisect_left(keys, after) if after is not None else len(keys)
+            source = (records[i] for i in range(end - 1, -1, -1))
+
+        if not show_blocked:
+            source = (record for record in source if not record.blocked)
+        if limit is None:
+            return list(source), None
+        page = list(islice(source, limit + 1))
+        if len(page) > limit:
+            return page[:limit], page[limit - 1]
+        return page, None
+
+    def stats(self) -> dict:
+        size = 0
+        names = set()
+        for record in self.records.values():
+            size += sys.getsizeof(record) + sys.getsizeof(record.clip_id) + sys.getsizeof(record.created_at)
+            if record.thumbnail_url:
+                size += sys.getsizeof(record.thumbnail_url)
+            if id(record.creator_name) not in names:
+                names.add(id(record.creator_name))
+                size += sys.getsizeof(record.creator_name)
+        # Lookup-Dicts und sortierte Schlüssel
+        size += sys.getsizeof(self.records) + sys.getsizeof(self.by_clip_id)
+        for keys, records in self.orders.values():
+            size += sys.getsizeof(keys) + sys.getsizeof(records) + len(keys) * sys.getsizeof((0, 0))
+        return {
+            "enabled": ClipCatalogConfig.ENABLED,
+            "clips": len(self.records),
+            "bytes": size,
+            "bytes_per_clip": round(size / len(self.records)) if self.records else None,
+            "sorted": list(self.orders),
+            "age_s": round(time.monotonic() - self.loaded_at) if self.loaded_at else None,
+            "stale": self.stale,
+        }
+
+
+clip_catalog = ClipCatalog()
@@ -1,62 +1,344 @@
-from sqlalchemy.orm import Session
-from app.models.clip import Clip
-from app.models.user import User
-from datetime import datetime
+from sqlalchemy import select, update, delete, func, all_, exists, literal, bindparam, literal_column, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.clip import Clip, BlockedClips, ClipSyncState
+from app.models.user import User, UserClipLike
+from app.twitch_func import get_clips_from_twitch, get_clip_history_from_twitch
+from app.utils.time_tracking_logger import logger
+from datetime import datetime, timedelta, timezone
 
 
-def save_clip_if_not_exists(clip, broadcaster_id: str, db: Session) -> None:
+class ClipSyncConfig:
+    # So oft wird statt des inkrementellen Syncs ein vollständiger Abgleich gemacht
+    FULL_SYNC_INTERVAL = timedelta(hours=24)
+    # Überlappung mit dem letzten Sync, falls Twitch neue Clips verzögert listet
+    WATERMARK_OVERLAP = timedelta(minutes=15)
+    # Zeilen pro INSERT (Postgres erlaubt max. 65535 Parameter pro Statement)
+    UPSERT_BATCH_SIZE = 1000
+
+
+def parse_created_at(value: str) -> datetime:
+    # Entferne das 'Z' aus dem ISO 8601 Format und konvertiere es in datetime
+    return datetime.fromisoformat(value.rstrip('Z'))
+
+
+async def resolve_creators(clips: list, db: AsyncSession) -> dict[str, int]:
+    """
+    Gibt für alle Ersteller der Clips twitch_id -> users.id zurück. Fehlende
+    Benutzer werden mit einem einzigen INSERT minimal angelegt.
     """
-    Prüft, ob der Clip bereits in der Datenbank existiert. Wenn nicht, wird er gespeichert.
+    creator_names = {clip["creator_id"]: clip["creator_name"] for clip in clips}
+    if not creator_names:
+        return {}
+
+    rows = await db.execute(
+        select(User.twitch_id, User.id).where(User.twitch_id.in_(list(creator_names)))
+    )
+    creators = dict(rows.all())
+
+    missing = [
+        {"twitch_id": twitch_id, "display_name": display_name}
+        for twitch_id, display_name in creator_names.items()
+        if twitch_id not in creators
+    ]
+    if missing:
+        # ON CONFLICT: ein paralleler Login/Sync kann den Benutzer gerade angelegt haben
+        rows = await db.execute(
+            pg_insert(User)
+            .values(missing)
+            .on_conflict_do_nothing(index_elements=[User.twitch_id])
+            .returning(User.twitch_id, User.id)
+        )
+        creators.update(rows.all())
+        if len(creators) < len(creator_names):
+            rows = await db.execute(
+                select(User.twitch_id, User.id).where(
+                    User.twitch_id.in_([twitch_id for twitch_id in creator_names if twitch_id not in creators])
+                )
+            )
+            creators.update(rows.all())
+    return creators
+
+
+async def upsert_clips(clips: list, broadcaster_id: str, db: AsyncSession) -> dict:
+    """
+    Speichert die Clips gesammelt in Blöcken: neue Clips werden angelegt, bei
+    bestehenden (gleiche clip_id) wird nur view_count aktualisiert. Es wird
+    nicht committet, damit der ganze Sync eine Transaktion bleibt.
+
+    Returns:
+        dict: Anzahl neu angelegter ("added") und aktualisierter ("updated") Clips.
+    """
+    # Twitch kann einen Clip auf mehreren Seiten liefern
+    unique_clips = list({clip["id"]: clip for clip in clips}.values())
+    creators = await resolve_creators(unique_clips, db)
+
+    rows = [
+        {
+            "clip_id": clip["id"],
+            "broadcaster_id": broadcaster_id,
+            "creator_id": creators[clip["creator_id"]],
+            "game_id": clip["game_id"],
+            "view_count": clip["view_count"],
+            "likes": clip.get("likes", 0),
+            "created_at": parse_created_at(clip["created_at"]),
+            "thumbnail_url": clip.get("thumbnail_url", ""),
+        }
+        for clip in unique_clips
+    ]
+
+    added = 0
+    batch_size = ClipSyncConfig.UPSERT_BATCH_SIZE
+    for i in range(0, len(rows), batch_size):
+        statement = pg_insert(Clip).values(rows[i:i + batch_size])
+        result = await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Clip.clip_id],
+                set_={"view_count": statement.excluded.view_count},
+            # xmax = 0: die Zeile wurde neu eingefügt, nicht aktualisiert
+            ).returning(literal_column("xmax = 0"))
+        )
+        added += sum(1 for inserted in result.scalars() if inserted)
+    return {"added": added, "updated": len(rows) - added}
+
+
+async def delete_missing_clips(twitch_clip_ids: list[str], broadcaster_id: str, db: AsyncSession) -> dict:
+    """
+    Löscht alle Clips des Broadcasters, die nicht in twitch_clip_ids stehen,
+    samt Likes und Block-Einträgen in einem einzigen Statement. Die IDs
+    werden als ein Array-Parameter übergeben.
+
+    Returns:
+        dict: Anzahl gelöschter Zeilen pro Tabelle.
+    """
+    # Ein leeres Array würde jeden Clip als verschwunden werten
+    if not twitch_clip_ids:
+        return {"clips": 0, "likes": 0, "blocked": 0}
+
+    stale = (
+        select(Clip.id)
+        .where(
+            Clip.broadcaster_id == broadcaster_id,
+            Clip.clip_id != all_(bindparam("twitch_clip_ids", list(twitch_clip_ids), type_=ARRAY(String))),
+        )
+        .cte("stale_clips")
+    )
+    # Alle DELETEs laufen im selben Statement; die Fremdschlüssel werden erst am Ende geprüft
+    deleted_likes = (
+        delete(UserClipLike)
+        .where(UserClipLike.clip_id.in_(select(stale.c.id)))
+        .returning(UserClipLike.id)
+        .cte("deleted_likes")
+    )
+    deleted_blocks = (
+        delete(BlockedClips)
+        .where(BlockedClips.clip_id.in_(select(stale.c.id)))
+        .returning(BlockedClips.id)
+        .cte("deleted_blocks")
+    )
+    deleted_clips = (
+        delete(Clip)
+        .where(Clip.id.in_(select(stale.c.id)))
+        .returning(Clip.id)
+        .cte("deleted_clips")
+    )
+    result = await db.execute(
+        select(
+            select(func.count()).select_from(deleted_clips).scalar_subquery().label("clips"),
+            select(func.count()).select_from(deleted_likes).scalar_subquery().label("likes"),
+            select(func.count()).select_from(deleted_blocks).scalar_subquery().label("blocked"),
+        )
+    )
+    return dict(result.one()._mapping)
+
+
+async def sync_clips_to_db(clips: list, broadcaster_id: str, db: AsyncSession) -> dict:
+    """
+    Gleicht die Clips von Twitch mit der Datenbank ab: Clips, die es auf
+    Twitch nicht mehr gibt, werden gelöscht, alle anderen gespeichert oder
+    aktualisiert. Committet wird vom Aufrufer.
 
     Args:
-        clip (dict): Die Clip-Daten von Twitch.
+        clips (list): Die Clip-Daten von Twitch.
         broadcaster_id (str): Die ID des Broadcasters.
-        db (Session): Die Datenbank-Sitzung.
+        db (AsyncSession): Die Datenbank-Sitzung.
 
     Returns:
-        None
-    """
-    clip_id = clip["id"]
-    creator_id = clip["creator_id"]
-    creator_name = clip["creator_name"]
-
-    # Überprüfe, ob der Benutzer (creator_id) bereits existiert, andernfalls erstelle ihn
-    creator = db.query(User).filter(User.twitch_id == creator_id).first()
-    if not creator:
-        # Einen minimalen Benutzer anlegen
-        new_user = User(
-            twitch_id=creator_id,
-            display_name=creator_name
+        dict: Neu angelegte, aktualisierte und gelöschte Clips.
+    """
+    deleted = await delete_missing_clips([clip['id'] for clip in clips], broadcaster_id, db)
+    if deleted["clips"]:
+        logger.info(
+            f"{deleted['clips']} Clips aus der Datenbank gelöscht "
+            f"({deleted['likes']} Likes, {deleted['blocked']} Block-Einträge)."
         )
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        creator = new_user  # Hole den frisch erstellten Benutzer
-
-    # Überprüfe, ob der Clip bereits existiert
-    existing_clip = db.query(Clip).filter(Clip.clip_id == clip_id).first()
-
-    if not existing_clip:
-        # Entferne das 'Z' aus dem ISO 8601 Format und konvertiere es in datetime
-        created_at_str = clip["created_at"].rstrip('Z')  # Entferne 'Z'
-        created_at = datetime.fromisoformat(created_at_str)  # Konvertiere in datetime-Objekt
-
-        # Wenn der Clip nicht existiert, erstelle einen neuen
-        new_clip = Clip(
-            clip_id=clip_id,
-            broadcaster_id=broadcaster_id,
-            creator_id=creator.id,  # Verwende die ID des Benutzers
-            game_id=clip["game_id"],
-            view_count=clip["view_count"],
-            likes=clip.get("likes", 0),
-            created_at=created_at,
-            thumbnail_url=clip.get("thumbnail_url", ""),
+
+    written = await upsert_clips(clips, broadcaster_id, db)
+    return {**written, "deleted": deleted}
+
+
+async def insert_like(clip_id: str, user_id: int, ip_address: str, db: AsyncSession) -> dict | None:
+    """
+    Speichert einen Like mit einem einzigen Statement: Clip suchen, eigenen
+    Clip ausschließen, INSERT ... ON CONFLICT DO NOTHING (Unique-Indizes auf
+    Benutzer/Clip und IP/Clip) und neue Like-Anzahl zurückgeben. Committet
+    wird vom Aufrufer.
+
+    Returns:
+        dict | None: None, wenn der Clip nicht existiert. Sonst creator_id,
+        inserted (0/1), likes (inkl. dieses Likes), liked_by_user, liked_by_ip.
+    """
+    target = (
+        select(Clip.id, Clip.creator_id, Clip.likes)
+        .where(Clip.clip_id == clip_id)
+        .cte("target")
+    )
+    inserted = (
+        pg_insert(UserClipLike)
+        .from_select(
+            ["user_id", "clip_id", "ip_address"],
+            select(literal(user_id), target.c.id, literal(ip_address))
+            .where(target.c.creator_id != user_id),
         )
-        db.add(new_clip)
+        .on_conflict_do_nothing()
+        .returning(UserClipLike.clip_id)
+        .cte("inserted")
+    )
+    inserted_count = select(func.count()).select_from(inserted).scalar_subquery()
+
+    # Die Unterabfragen sehen den Stand vor dem INSERT; der Trigger zählt clips.likes erst danach hoch
+    result = await db.execute(
+        select(
+            target.c.creator_id,
+            inserted_count.label("inserted"),
+            (func.coalesce(target.c.likes, 0) + inserted_count).label("likes"),
+            exists().where(UserClipLike.user_id == user_id, UserClipLike.clip_id == target.c.id).label("liked_by_user"),
+            exists().where(UserClipLike.clip_id == target.c.id, UserClipLike.ip_address == ip_address).label("liked_by_ip"),
+        ).select_from(target)
+    )
+    row = result.one_or_none()
+    return dict(row._mapping) if row else None
+
+
+async def check_like(clip_id: str, user_id: int, ip_address: str, db: AsyncSession) -> dict | None:
+    """
+    Liest Clip und bestehende Likes von Benutzer/IP, ohne zu schreiben (für
+    den gepufferten Modus, siehe app/like_buffer.py).
+
+    Returns:
+        dict | None: None, wenn der Clip nicht existiert. Sonst id, creator_id,
+        likes, liked_by_user, liked_by_ip.
+    """
+    result = await db.execute(
+        select(
+            Clip.id,
+            Clip.creator_id,
+            func.coalesce(Clip.likes, 0).label("likes"),
+            exists().where(UserClipLike.user_id == user_id, UserClipLike.clip_id == Clip.id).label("liked_by_user"),
+            exists().where(UserClipLike.clip_id == Clip.id, UserClipLike.ip_address == ip_address).label("liked_by_ip"),
+        ).where(Clip.clip_id == clip_id)
+    )
+    row = result.one_or_none()
+    return dict(row._mapping) if row else None
+
+
+async def reconcile_like_counts(db: AsyncSession) -> int:
+    """
+    Setzt clips.likes auf die tatsächliche Anzahl in user_clip_likes, falls der
+    Zähler (z.B. durch Likes vor Einführung des Triggers) abweicht. Committet
+    wird vom Aufrufer.
+
+    Returns:
+        int: Anzahl korrigierter Clips.
+    """
+    like_count = func.coalesce(
+        select(func.count(UserClipLike.id))
+        .where(UserClipLike.clip_id == Clip.id)
+        .scalar_subquery(),
+        0,
+    )
+    result = await db.execute(
+        update(Clip)
+        .values(likes=like_count)
+        .where(Clip.likes.is_distinct_from(like_count))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        logger.info(f"Like-Zähler von {result.rowcount} Clips korrigiert.")
+    return result.rowcount
+
+
+def as_utc(value: datetime) -> datetime:
+    # Ohne Zeitzone gespeicherte Zeitpunkte sind UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def get_sync_state(broadcaster_id: str, db: AsyncSession) -> ClipSyncState:
+    state = await db.scalar(select(ClipSyncState).where(ClipSyncState.broadcaster_id == broadcaster_id))
+    if not state:
+        state = ClipSyncState(broadcaster_id=broadcaster_id)
+        db.add(state)
+    return state
+
+
+async def sync_broadcaster_clips(
+    broadcaster_id: str,
+    access_token: str,
+    db: AsyncSession,
+    full: bool = False,
+    broadcaster_created_at: datetime | None = None,
+) -> dict | None:
+    """
+    Synchronisiert die Clips eines Broadcasters.
+
+    Standardmäßig werden nur Clips abgefragt, die seit dem letzten
+    erfolgreichen Sync erstellt wurden (Watermark in ClipSyncState). Beim
+    ersten Lauf, auf Anfrage oder nach FULL_SYNC_INTERVAL wird vollständig
+    abgeglichen: gelöschte Clips werden entfernt, View-Counts aktualisiert.
+    Ist broadcaster_created_at bekannt, wird der vollständige Abgleich in
+    parallel abgefragten Zeitfenstern ab diesem Datum geladen.
+
+    Returns:
+        dict | None: {"mode", "clips", "added", "updated", "deleted"} oder None, wenn Twitch nicht geantwortet hat.
+    """
+    state = await get_sync_state(broadcaster_id, db)
+    sync_started_at = datetime.now(timezone.utc)
+    # Lesetransaktion beenden: während der Twitch-Anfragen bleibt keine Verbindung "idle in transaction"
+    await db.commit()
+
+    if not full and state.last_synced_at and state.last_full_sync_at:
+        full = sync_started_at - as_utc(state.last_full_sync_at) >= ClipSyncConfig.FULL_SYNC_INTERVAL
     else:
-        # Wenn der Clip bereits existiert, aktualisiere die Anzahl der Aufrufe (view_count)
-        existing_clip.view_count = clip["view_count"]
-    db.commit()
-    
-    # print(f"Clip ID: {clip_id}, Thumbnail URL: {clip.get('thumbnail_url')}")
+        full = True
+
+    if full:
+        if broadcaster_created_at:
+            clips = await get_clip_history_from_twitch(
+                broadcaster_id, access_token, since=as_utc(broadcaster_created_at), until=sync_started_at
+            )
+        else:
+            clips = await get_clips_from_twitch(broadcaster_id, access_token)
+        # Ohne Clips nichts löschen: lieber beim nächsten Lauf erneut versuchen
+        if not clips:
+            return None
+        written = await sync_clips_to_db(clips, broadcaster_id, db)
+        written["likes_reconciled"] = await reconcile_like_counts(db)
+        state.last_full_sync_at = sync_started_at
+    else:
+        clips = await get_clips_from_twitch(
+            broadcaster_id,
+            access_token,
+            started_at=as_utc(state.last_synced_at) - ClipSyncConfig.WATERMARK_OVERLAP,
+            ended_at=sync_started_at,
+        )
+        if clips is None:
+            return None
+        written = await upsert_clips(clips, broadcaster_id, db)
+
+    # Watermark erst nach erfolgreichem Speichern weitersetzen; eine Schreibtransaktion für alles
+    state.last_synced_at = sync_started_at
+    await db.commit()
 
+    mode = "full" if full else "incremental"
+    logger.info(f"Clip-Sync ({mode}) für {broadcaster_id}: {len(clips)} Clips von Twitch.")
+    return {"mode": mode, "clips": len(clips), "deleted": {"clips": 0, "likes": 0, "blocked": 0}, **written}
@@ -0,0 +1,165 @@
+import os
+import time
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import select, func
+from app.database.db_connection import SessionLocal, engine
+from app.clip_func import sync_broadcaster_clips, parse_created_at
+from app.twitch_func import generate_access_token, get_broadcaster
+from app.twitch_ratelimit import HelixCallCounter, helix_call_counter
+from app.clip_catalog import clip_catalog
+from app.utils.response_cache import clip_list_cache, liked_clips_cache
+from app.utils.time_tracking_logger import logger
+
+
+class ClipSyncServiceConfig:
+    ENABLED = os.getenv("CLIP_SYNC_ENABLED", "true").lower() == "true"
+    # Abstand zwischen zwei geplanten Syncs (Sekunden)
+    INTERVAL = int(os.getenv("CLIP_SYNC_INTERVAL", "900"))
+    # Erster Sync so lange nach dem Start (Sekunden)
+    INITIAL_DELAY = 10
+    BROADCASTER = "miwitv"
+    # So viele Läufe werden für /clip/sync_status aufbewahrt
+    HISTORY_SIZE = 20
+    # Schlüssel für pg_try_advisory_lock: nur ein Worker synchronisiert gleichzeitig
+    LOCK_ID = 7_250_002
+
+
+class ClipSyncService:
+    """
+    Führt den Clip-Sync im Hintergrund aus: regelmäßig im Intervall oder
+    auf Anfrage (POST /clip/sync_clips). Ein Lock sorgt dafür, dass immer nur
+    ein Lauf gleichzeitig stattfindet; jeder Lauf wird mit Dauer, Clip-Zahlen
+    und Helix-Anfragen in einer kurzen Historie festgehalten.
+    """
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.pending: str | None = None
+        self.pending_full = False
+        self.current: dict | None = None
+        self.next_run_at: datetime | None = None
+        self.history: deque[dict] = deque(maxlen=ClipSyncServiceConfig.HISTORY_SIZE)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(), name="clip-sync")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def request(self, full: bool = False) -> bool:
+        """
+        Plant einen Lauf so bald wie möglich ein. Gibt False zurück, wenn
+        bereits ein Lauf wartet (der dann ggf. zum vollständigen Abgleich wird).
+        """
+        already_pending = self.pending is not None
+        self.pending = "manual"
+        self.pending_full = self.pending_full or full
+        self.wakeup.set()
+        # Ohne laufenden Scheduler (z.B. CLIP_SYNC_ENABLED=false) einmalig ausführen
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run_pending(), name="clip-sync-once")
+        return not already_pending
+
+    async def run(self):
+        await asyncio.sleep(ClipSyncServiceConfig.INITIAL_DELAY)
+        while True:
+            if self.pending is None:
+                self.pending = "schedule"
+            await self.run_pending()
+
+            self.next_run_at = datetime.fromtimestamp(time.time() + ClipSyncServiceConfig.INTERVAL, timezone.utc)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=ClipSyncServiceConfig.INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_pending(self):
+        while self.pending is not None:
+            trigger, full = self.pending, self.pending_full
+            self.pending, self.pending_full = None, False
+            self.wakeup.clear()
+            await self.run_once(trigger, full)
+
+    async def run_once(self, trigger: str, full: bool = False) -> dict:
+        async with self.lock:
+            counter = HelixCallCounter()
+            token = helix_call_counter.set(counter)
+            started = time.perf_counter()
+            entry = {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "trigger": trigger,
+                "status": "running",
+            }
+            self.current = entry
+            try:
+                entry.update(await self.sync(full))
+            except Exception as e:
+                logger.error(f"Clip-Sync fehlgeschlagen: {str(e)}")
+                entry.update({"status": "failed", "error": str(e)})
+            finally:
+                helix_call_counter.reset(token)
+                entry["duration_ms"] = round((time.perf_counter() - started) * 1000)
+                entry["helix_calls"] = counter.calls
+                self.current = None
+                self.history.appendleft(entry)
+
+            logger.info(f"Clip-Sync ({trigger}) beendet: {entry}")
+            return entry
+
+    async def sync(self, full: bool) -> dict:
+        access_token = await generate_access_token()
+        broadcaster = await get_broadcaster(ClipSyncServiceConfig.BROADCASTER, access_token)
+        if not broadcaster:
+            return {"status": "failed", "error": "Broadcaster not found"}
+
+        # Sitzungs-Lock auf eigener Verbindung (wie der Leader-Lock im StreamRelay): hält keine
+        # Transaktion offen, während Twitch abgefragt wird
+        async with engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(select(func.pg_try_advisory_lock(ClipSyncServiceConfig.LOCK_ID)))
+            await lock_conn.commit()
+            # Läuft der Sync schon in einem anderen Worker, diesen Lauf auslassen
+            if not locked:
+                return {"status": "skipped", "error": "Sync läuft bereits in einem anderen Worker"}
+
+            try:
+                async with SessionLocal() as db:
+                    result = await sync_broadcaster_clips(
+                        broadcaster["id"],
+                        access_token,
+                        db,
+                        full=full,
+                        broadcaster_created_at=parse_created_at(broadcaster["created_at"]),
+                    )
+            finally:
+                await lock_conn.scalar(select(func.pg_advisory_unlock(ClipSyncServiceConfig.LOCK_ID)))
+                await lock_conn.commit()
+        if result is None:
+            return {"status": "failed", "error": "No clips found"}
+        clip_catalog.invalidate()
+        clip_list_cache.bump()
+        liked_clips_cache.bump()
+        return {"status": "ok", **result}
+
+    def status(self) -> dict:
+        return {
+            "enabled": ClipSyncServiceConfig.ENABLED,
+            "interval": ClipSyncServiceConfig.INTERVAL,
+            "running": self.current,
+            "pending": self.pending is not None,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "history": list(self.history),
+        }
+
+
+clip_sync_service = ClipSyncService()
@@ -1,5 +1,4 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 import os
 
@@ -10,15 +9,18 @@ class Database:
     HOST = os.getenv("POSTGRES_HOST")
     DRIVER = "postgresql+psycopg"
 
-# Postgresql
+# Postgresql (psycopg 3 im async Modus)
 DATABASE_URL = f"{Database.DRIVER}://{Database.USER}:{Database.PASSWORD}@{Database.HOST}/{Database.DATABASE}"
+# Für direkte psycopg-Verbindungen (z.B. LISTEN/NOTIFY)
+CONNINFO = f"postgresql://{Database.USER}:{Database.PASSWORD}@{Database.HOST}/{Database.DATABASE}"
 
-engine = create_engine(
+engine = create_async_engine(
     DATABASE_URL,
     pool_pre_ping=True
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: nach einem Commit werden keine Attribute nachgeladen (kein Lazy-IO in async)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 
 Base = declarative_base()
@@ -26,9 +28,11 @@ Base = declarative_base()
 metadata = Base.metadata
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+
+async def create_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,92 @@
+from sqlalchemy import text
+from app.database.db_connection import engine
+from app.utils.time_tracking_logger import logger
+
+# Schlüssel für pg_advisory_xact_lock: mehrere Worker starten gleichzeitig
+SCHEMA_LOCK_ID = 7_250_003
+
+# Ergänzungen, die create_all nicht abdeckt. Alle Statements sind idempotent
+# und laufen bei jedem Start.
+SCHEMA_STATEMENTS = [
+    # clips.likes wird von der Datenbank gepflegt (ein UPDATE pro Statement, nicht pro Like)
+    """
+    CREATE OR REPLACE FUNCTION clip_likes_inserted() RETURNS trigger AS $$
+    BEGIN
+        UPDATE clips SET likes = COALESCE(clips.likes, 0) + added.count
+        FROM (SELECT clip_id, count(*) AS count FROM new_likes GROUP BY clip_id) AS added
+        WHERE clips.id = added.clip_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION clip_likes_deleted() RETURNS trigger AS $$
+    BEGIN
+        UPDATE clips SET likes = GREATEST(COALESCE(clips.likes, 0) - removed.count, 0)
+        FROM (SELECT clip_id, count(*) AS count FROM old_likes GROUP BY clip_id) AS removed
+        WHERE clips.id = removed.clip_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS user_clip_likes_inserted ON user_clip_likes",
+    """
+    CREATE TRIGGER user_clip_likes_inserted
+    AFTER INSERT ON user_clip_likes
+    REFERENCING NEW TABLE AS new_likes
+    FOR EACH STATEMENT EXECUTE FUNCTION clip_likes_inserted()
+    """,
+    "DROP TRIGGER IF EXISTS user_clip_likes_deleted ON user_clip_likes",
+    """
+    CREATE TRIGGER user_clip_likes_deleted
+    AFTER DELETE ON user_clip_likes
+    REFERENCING OLD TABLE AS old_likes
+    FOR EACH STATEMENT EXECUTE FUNCTION clip_likes_deleted()
+    """,
+    # Von den beiden eindeutigen Like-Indizes (UNIQUE_LIKE_MIGRATION) abgedeckt
+    "DROP INDEX IF EXISTS ix_user_clip_ip",
+    # Keyset-Paginierung der Clip-Listen (siehe Clip.__table_args__)
+    "CREATE INDEX IF NOT EXISTS ix_clips_likes_id ON clips (likes, id)",
+    "CREATE INDEX IF NOT EXISTS ix_clips_view_count_id ON clips (view_count, id)",
+    "CREATE INDEX IF NOT EXISTS ix_clips_created_at_id ON clips (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_user_clip_likes_user_liked_at ON user_clip_likes (user_id, liked_at, id)",
+]
+
+# Einmalige Migration: ein Like pro Benutzer und Clip sowie pro IP und Clip.
+# Löscht doppelte Altlasten und läuft deshalb nur, solange ein Index fehlt.
+UNIQUE_LIKE_MIGRATION = [
+    """
+    DELETE FROM user_clip_likes AS duplicate USING user_clip_likes AS original
+    WHERE duplicate.user_id = original.user_id
+      AND duplicate.clip_id = original.clip_id
+      AND duplicate.id > original.id
+    """,
+    """
+    DELETE FROM user_clip_likes AS duplicate USING user_clip_likes AS original
+    WHERE duplicate.clip_id = original.clip_id
+      AND duplicate.ip_address = original.ip_address
+      AND duplicate.id > original.id
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_clip_likes_user_clip ON user_clip_likes (user_id, clip_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_clip_likes_clip_ip ON user_clip_likes (clip_id, ip_address)",
+]
+UNIQUE_LIKE_INDEXES_MISSING = """
+    SELECT to_regclass('ix_user_clip_likes_user_clip') IS NULL
+        OR to_regclass('ix_user_clip_likes_clip_ip') IS NULL
+"""
+
+
+async def ensure_schema():
+    """
+    Legt Trigger, Funktionen und Indizes an, die create_all bei bestehenden
+    Tabellen nicht anlegt, und führt die einmalige Like-Migration aus.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SCHEMA_LOCK_ID})
+        if await conn.scalar(text(UNIQUE_LIKE_INDEXES_MISSING)):
+            for statement in UNIQUE_LIKE_MIGRATION:
+                await conn.execute(text(statement))
+            logger.info("Duplicate likes removed and unique like indexes created")
+        for statement in SCHEMA_STATEMENTS:
+            await conn.execute(text(statement))
+    logger.info("Database schema extensions ensured")
@@ -0,0 +1,43 @@
+import httpx
+from app.utils.time_tracking_logger import logger
+
+
+class HttpClientConfig:
+    # Keep-Alive Pool für Twitch (api/id) und StreamElements
+    LIMITS = httpx.Limits(
+        max_connections=100,
+        max_keepalive_connections=20,
+        keepalive_expiry=60.0,
+    )
+    TIMEOUT = httpx.Timeout(10.0, connect=5.0, pool=5.0)
+    HTTP2 = True
+
+
+http_client: httpx.AsyncClient | None = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HttpClientConfig.HTTP2,
+        limits=HttpClientConfig.LIMITS,
+        timeout=HttpClientConfig.TIMEOUT,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Gibt den gemeinsamen HTTP-Client für alle ausgehenden Anfragen zurück.
+    Er wird im Lifespan der App geöffnet; außerhalb davon wird er bei Bedarf angelegt.
+    """
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client()
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+    if http_client is not None and not http_client.is_closed:
+        await http_client.aclose()
+        logger.info("HTTP client closed")
+    http_client = None
@@ -0,0 +1,146 @@
+import os
+import asyncio
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.db_connection import SessionLocal
+from app.models.user import UserClipLike
+from app.clip_func import check_like
+from app.utils.response_cache import clip_list_cache, liked_clips_cache
+from app.utils.time_tracking_logger import logger
+
+
+class LikeBufferConfig:
+    # Gepufferter Modus für Lastspitzen (Raids, Clip-Wettbewerbe); standardmäßig aus
+    ENABLED = os.getenv("LIKE_BUFFER_ENABLED", "false").lower() == "true"
+    # Spätestens nach so vielen Millisekunden wird geschrieben
+    FLUSH_INTERVAL_MS = int(os.getenv("LIKE_BUFFER_FLUSH_MS", "250"))
+    # ... oder sobald so viele Likes warten
+    FLUSH_ROWS = int(os.getenv("LIKE_BUFFER_FLUSH_ROWS", "500"))
+    # Höchstens so viele noch nicht geschriebene Likes; darüber wird direkt geschrieben.
+    # Zusammen mit FLUSH_INTERVAL_MS die Obergrenze dessen, was ein Absturz kosten kann.
+    MAX_PENDING = int(os.getenv("LIKE_BUFFER_MAX_PENDING", "5000"))
+
+
+class LikeBuffer:
+    """
+    Write-Behind-Puffer für Likes.
+
+    Likes werden gegen die Datenbank und die noch ungeschriebenen Likes
+    geprüft, sofort bestätigt und gesammelt mit einem mehrzeiligen
+    INSERT ... ON CONFLICT DO NOTHING geschrieben. Der Trigger auf
+    user_clip_likes zählt clips.likes im selben Statement hoch.
+    """
+
+    def __init__(self):
+        self.pending: list[dict] = []
+        # Noch nicht geschriebene Likes (inkl. des laufenden Flushs) zur Dublettenprüfung
+        self.pending_users: set[tuple[int, int]] = set()
+        self.pending_ips: set[tuple[int, str]] = set()
+        self.pending_per_clip: dict[int, int] = {}
+        self.flush_event = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.task: asyncio.Task | None = None
+        self.flushed = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    @property
+    def full(self) -> bool:
+        return len(self.pending_users) >= LikeBufferConfig.MAX_PENDING
+
+    def start(self):
+        if not self.running:
+            self.task = asyncio.create_task(self.run(), name="like-buffer")
+            logger.info("Like buffer started")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        # Letzte Likes vor dem Beenden schreiben
+        await self.flush()
+        logger.info(f"Like buffer stopped ({self.flushed} likes written)")
+
+    async def add(self, clip_id: str, user_id: int, ip_address: str, db: AsyncSession) -> dict | None:
+        """
+        Prüft und puffert einen Like. Gibt dasselbe Format wie
+        clip_func.insert_like zurück; likes enthält die gepufferten Likes.
+        """
+        like = await check_like(clip_id, user_id, ip_address, db)
+        if like is None:
+            return None
+
+        clip_db_id = like.pop("id")
+        like["liked_by_user"] = like["liked_by_user"] or (user_id, clip_db_id) in self.pending_users
+        like["liked_by_ip"] = like["liked_by_ip"] or (clip_db_id, ip_address) in self.pending_ips
+        like["inserted"] = 0
+        if like["creator_id"] != user_id and not like["liked_by_user"] and not like["liked_by_ip"]:
+            self.pending.append({"user_id": user_id, "clip_id": clip_db_id, "ip_address": ip_address})
+            self.pending_users.add((user_id, clip_db_id))
+            self.pending_ips.add((clip_db_id, ip_address))
+            self.pending_per_clip[clip_db_id] = self.pending_per_clip.get(clip_db_id, 0) + 1
+            like["inserted"] = 1
+            if len(self.pending) >= LikeBufferConfig.FLUSH_ROWS:
+                self.flush_event.set()
+
+        like["likes"] += self.pending_per_clip.get(clip_db_id, 0)
+        return like
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), timeout=LikeBufferConfig.FLUSH_INTERVAL_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_event.clear()
+            await self.flush()
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.pending:
+                return
+            rows, self.pending = self.pending, []
+            try:
+                async with SessionLocal() as db:
+                    try:
+                        # Dubletten aus anderen Workern fängt ON CONFLICT ab
+                        await db.execute(pg_insert(UserClipLike).values(rows).on_conflict_do_nothing())
+                        await db.commit()
+                    except IntegrityError:
+                        # Z.B. Clip inzwischen vom Sync gelöscht: einzeln schreiben, fehlerhafte verwerfen
+                        await db.rollback()
+                        await self.insert_each(rows, db)
+            except Exception as e:
+                # Beim nächsten Flush erneut versuchen
+                logger.error(f"Like buffer flush of {len(rows)} likes failed: {str(e)}")
+                self.pending = rows + self.pending
+                return
+
+            self.flushed += len(rows)
+            clip_list_cache.bump()
+            liked_clips_cache.bump()
+            for row in rows:
+                self.pending_users.discard((row["user_id"], row["clip_id"]))
+                self.pending_ips.discard((row["clip_id"], row["ip_address"]))
+                count = self.pending_per_clip.pop(row["clip_id"], 0) - 1
+                if count > 0:
+                    self.pending_per_clip[row["clip_id"]] = count
+
+    async def insert_each(self, rows: list[dict], db: AsyncSession):
+        for row in rows:
+            try:
+                await db.execute(pg_insert(UserClipLike).values(row).on_conflict_do_nothing())
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                logger.warning(f"Like buffer dropped like {row}: clip or user no longer exists")
+
+
+like_buffer = LikeBuffer()
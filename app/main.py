@@ -1,35 +1,74 @@
 import httpx
-import asyncio
+from contextlib import asynccontextmanager
 from app.routes import (challenge, user, clip)
 from typing import Annotated
 from app.token import create_jwt
 from pydantic import BaseModel 
-from sqlalchemy.orm import Session 
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User, Clip, UserClipLike, Challenge, Section, Item
-from app.database.db_connection import Base, engine, get_db
+from app.database.db_connection import engine, get_db, create_tables, SessionLocal
+from app.database.schema import ensure_schema
+from app.clip_func import reconcile_like_counts
 from datetime import datetime, timedelta
 from fastapi.middleware.cors import CORSMiddleware 
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, JSONResponse, ORJSONResponse
 from app.twitch_func import (
     get_user_info, 
-    get_oauth_token, 
-    fetch_stream_status,
     get_access_token,
 )
-from app.user_func import (save_or_update_user)
+from app.stream_status import stream_hub, POLL_INTERVAL
+from app.stream_relay import stream_relay, StreamRelayConfig
+from app.clip_sync import clip_sync_service, ClipSyncServiceConfig
+from app.like_buffer import like_buffer, LikeBufferConfig
+from app.clip_catalog import clip_catalog, ClipCatalogConfig
+from app.http_client import get_http_client, close_http_client
+from app.user_func import (save_or_update_user, get_db_user)
 from fastapi import FastAPI, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from app.twitch_data import Twitch
 from app.utils.display_client_data import Client
 from app.utils.time_tracking_logger import logger
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.response_cache import response_cache_stats
+from app.utils.json_snapshot import clip_snapshots
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Gemeinsamer HTTP-Client (Keep-Alive, HTTP/2) für alle ausgehenden Anfragen
+    get_http_client()
+    await create_tables()
+    # Trigger für clips.likes anlegen und den Zähler einmal abgleichen
+    await ensure_schema()
+    async with SessionLocal() as db:
+        await reconcile_like_counts(db)
+        await db.commit()
+        # Clip-Katalog für /clip/all einmal laden (danach über Likes, Blockierungen und Sync aktuell)
+        if ClipCatalogConfig.ENABLED:
+            await clip_catalog.load(db)
+    # Stream-Status über Postgres LISTEN/NOTIFY mit allen Workern teilen
+    if StreamRelayConfig.ENABLED:
+        stream_relay.start()
+    # Clip-Sync im Intervall statt nur per POST /clip/sync_clips
+    if ClipSyncServiceConfig.ENABLED:
+        clip_sync_service.start()
+    # Likes gesammelt schreiben (LIKE_BUFFER_ENABLED)
+    if LikeBufferConfig.ENABLED:
+        like_buffer.start()
+    yield
+    # Gepufferte Likes schreiben, solange die Datenbank noch erreichbar ist
+    await like_buffer.stop()
+    await clip_sync_service.stop()
+    await stream_relay.stop()
+    await stream_hub.stop()
+    await close_http_client()
+    await engine.dispose()
+
+# Antworten mit orjson statt json.dumps serialisieren
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(user.router)
 app.include_router(clip.router)
 app.include_router(challenge.router)
 
-connected_clients = {}
-
 origins = [
     'https://dev.miwi.tv',
     'https://miwi.tv',
@@ -41,108 +80,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Erlaubt alle Methoden wie GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],  # Erlaubt alle Header
+    expose_headers=[NEXT_CURSOR_HEADER],  # Cursor der nächsten Seite für das Frontend lesbar
 )
 
-Base.metadata.create_all(bind=engine)
-
-
 class UserBase(BaseModel):
     email:str
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 
 @app.websocket("/ws/{user_login}")
 async def websocket_endpoint(websocket: WebSocket, user_login: str):
     await websocket.accept()
-    
-    # Get initial token
-    token = await get_oauth_token()
-    if not token:
-        # Send error message and close if we can't get a token
-        await websocket.send_json({"status": "error", "message": "Failed to authenticate with Twitch"})
-        await websocket.close(1011)  # 1011 = Server error
-        return
-        
-    # Store connection
-    connected_clients[user_login] = websocket
+
+    # Alle Zuschauer eines Channels teilen sich einen Poller
+    await stream_hub.subscribe(user_login, websocket)
 
     try:
-        previous_status = None
-        token_refresh_counter = 0
-        error_count = 0
-        
+        # Verbindung offen halten, bis der Client sie beendet
         while True:
-            try:
-                # Increment token refresh counter
-                token_refresh_counter += 1
-                
-                # Refresh token every 30 minutes (60 loops * 30 seconds)
-                if token_refresh_counter >= 60:
-                    new_token = await get_oauth_token()
-                    if new_token:
-                        token = new_token
-                    token_refresh_counter = 0
-                
-                # Fetch stream status
-                stream_data = await fetch_stream_status(user_login, token)
-                
-                # Reset error counter on success
-                error_count = 0
-                
-                # Determine status
-                current_status = "online" if stream_data else "offline"
-                
-                # Only send if status changed
-                if current_status != previous_status:
-                    await websocket.send_json({
-                        "status": current_status,
-                        "data": stream_data,
-                    })
-                    previous_status = current_status
-                
-                # Wait before next check
-                await asyncio.sleep(30)
-                
-            except WebSocketDisconnect:
-                # Client disconnected, break the loop
-                raise
-                
-            except Exception as e:
-                error_count += 1
-                logger.info(f"Error in WebSocket loop for {user_login}: {str(e)}")
-                
-                # After 3 consecutive errors, try refreshing the token
-                if error_count >= 3:
-                    logger.info(f"Refreshing token after multiple errors for {user_login}")
-                    new_token = await get_oauth_token()
-                    if new_token:
-                        token = new_token
-                    error_count = 0
-                
-                # Exponential backoff: wait longer between retries (max 60 seconds)
-                backoff_time = min(5 * (2 ** (error_count - 1)), 60)
-                await asyncio.sleep(backoff_time)
-                
-                # Try to send heartbeat to check if connection is still alive
-                try:
-                    await websocket.send_json({"status": "heartbeat"})
-                except:
-                    # Connection is dead, break the loop
-                    raise WebSocketDisconnect()
-    
+            await websocket.receive_text()
+
     except WebSocketDisconnect:
         logger.info(f"Client disconnected: {user_login}")
-        if user_login in connected_clients:
-            del connected_clients[user_login]
     except Exception as e:
         logger.info(f"Unexpected error in websocket for {user_login}: {str(e)}")
-        if user_login in connected_clients:
-            del connected_clients[user_login]
         try:
             await websocket.close(1011)
         except:
             pass
+    finally:
+        await stream_hub.unsubscribe(user_login, websocket)
+
+@app.get("/ws/stats")
+async def websocket_stats(
+    db: db_dependency,
+    current_user: dict = Depends(user.get_current_user)
+):
+    # Zuschauer und Sendewarteschlangen pro Channel (nur Admins/Mods)
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
+    user.check_access_by_role(db_user.role, [0, 1])
+    return stream_hub.stats()
+
+@app.get("/cache/stats")
+async def cache_stats(
+    db: db_dependency,
+    current_user: dict = Depends(user.get_current_user)
+):
+    # Treffer/Fehlschläge der Antwort-Caches dieses Workers (nur Admins/Mods)
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
+    user.check_access_by_role(db_user.role, [0, 1])
+    return {
+        **response_cache_stats(),
+        "clip_snapshots": clip_snapshots.stats(),
+        "clip_catalog": clip_catalog.stats(),
+    }
+
+# Auf den ersten Status eines noch unbekannten Channels so lange warten (Sekunden)
+STREAM_STATUS_WAIT = 5
+
+@app.get("/stream/{user_login}")
+async def get_stream_status(user_login: str, request: Request):
+    # Antwort kommt aus dem Status-Cache des Pollers, nicht direkt von Twitch
+    channel = await stream_hub.lookup(user_login, timeout=STREAM_STATUS_WAIT)
+    if channel is None or channel.status is None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unknown"},
+            headers={"Retry-After": str(STREAM_STATUS_WAIT), "Cache-Control": "no-store"},
+        )
+
+    headers = {
+        "ETag": channel.etag,
+        # Ändert sich frühestens mit dem nächsten Durchlauf des Pollers
+        "Cache-Control": f"public, max-age={POLL_INTERVAL // 2}",
+    }
+    if channel.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content={"status": channel.status}, headers=headers)
 
 @app.get("/login")
 async def login(request: Request):
@@ -177,16 +192,16 @@ async def auth_callback(
         code: str, db: db_dependency
     ): # type: ignore
     # Access Token abrufen
-    access_token, expires_in_seconds = get_access_token(code)
+    access_token, expires_in_seconds = await get_access_token(code)
 
     logger.info(f"backend[/auth/callback]: Access Token {access_token} erhalten. Expires in {expires_in_seconds} Sekunden.")
     
     # Benutzerinformationen abrufen
-    user_info = get_user_info(access_token)
+    user_info = await get_user_info(access_token)
     logger.info(f"backend[/auth/callback]: Benutzerinformationen erhalten: {user_info}")
 
     # Benutzer speichern oder aktualisieren
-    user = save_or_update_user(user_info, db)
+    user = await save_or_update_user(user_info, db)
 
     # Ablaufzeit berechnen
     expiration_time = datetime.utcnow() + timedelta(seconds=expires_in_seconds)
@@ -233,8 +248,7 @@ async def get_giveaways():
         "Authorization": f"Bearer {Twitch.JWT_Token}",
     }
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
+        response = await get_http_client().get(url, headers=headers)
         
         if response.status_code != 200:
             return response.json()  # Erfolgreiche Antwort
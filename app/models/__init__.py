@@ -1,6 +1,7 @@
 from app.models.clip import (
     Clip, 
-    BlockedClips
+    BlockedClips,
+    ClipSyncState
 )
 from app.models.user import (
     User, UserClipLike
@@ -1,6 +1,6 @@
 # /app/models/clip.py
 # from app.models.rating import Rating
-from sqlalchemy.orm import relationship, Session
+from sqlalchemy.orm import relationship
 from sqlalchemy import Column, String, Integer, TIMESTAMP, func, Index, ForeignKey, Boolean
 from app.database.db_connection import Base  # Base-Klasse für alle Modelle
 from app.models.user import UserClipLike
@@ -18,7 +18,7 @@ class Clip(Base):
     game_id = Column(String(100), nullable=False)  # Game ID
     view_count = Column(Integer, default=0)  # Anzahl der Views
     created_at = Column(TIMESTAMP, nullable=False)  # Zeitpunkt der Erstellung
-    likes = Column(Integer, default=0)  # Anzahl der Likes
+    likes = Column(Integer, default=0)  # Anzahl der Likes (per Trigger gepflegt, siehe app/database/schema.py)
     thumbnail_url = Column(String(255), nullable=True)  # URL des Thumbnails
 
     creator = relationship('User', back_populates='clips')
@@ -28,6 +28,10 @@ class Clip(Base):
     
     __table_args__ = (
         Index('ix_game_id', 'game_id'),
+        # Keyset-Paginierung der Clip-Listen (Sortierung, id)
+        Index('ix_clips_likes_id', 'likes', 'id'),
+        Index('ix_clips_view_count_id', 'view_count', 'id'),
+        Index('ix_clips_created_at_id', 'created_at', 'id'),
     )
     
     def get_embed_url(self):
@@ -35,10 +39,6 @@ class Clip(Base):
         if not self.clip_id:
             raise ValueError("Clip ID is missing.")
         return f"https://clips.twitch.tv/embed?clip={self.clip_id}&parent={PARENT_URL}"
-    
-    def calculate_likes(self, db: Session):
-        """Berechnet die Anzahl der Likes für diesen Clip."""
-        return db.query(func.count(UserClipLike.id)).filter(UserClipLike.clip_id == self.id).scalar()
 
 
 class BlockedClips(Base):
@@ -54,4 +54,16 @@ class BlockedClips(Base):
 
     # Beziehungen
     clip = relationship('Clip', backref='blocked_status')
-    editor = relationship('User', backref='edited_blocks')
\ No newline at end of file
+    editor = relationship('User', backref='edited_blocks')
+
+
+class ClipSyncState(Base):
+    """Stand der Clip-Synchronisation pro Broadcaster (Watermark für den inkrementellen Sync)."""
+    __tablename__ = 'clip_sync_state'
+
+    id = Column(Integer, primary_key=True, index=True)
+    broadcaster_id = Column(String(100), unique=True, nullable=False)
+    # Bis zu diesem Zeitpunkt (created_at der Clips) ist alles synchronisiert
+    last_synced_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    # Letzter vollständiger Abgleich (Löschungen, View-Counts)
+    last_full_sync_at = Column(TIMESTAMP(timezone=True), nullable=True)
@@ -39,8 +39,12 @@ class UserClipLike(Base):
     user = relationship('User', back_populates='clip_likes')  # User <-> Likes Beziehung
     clip = relationship('Clip', back_populates='user_likes')  # Clip <-> Likes Beziehung
 
-    # Unique Constraint: Jeder Benutzer kann einen Clip nur einmal mit derselben IP liken
+    # Unique Constraints: Jeder Benutzer kann einen Clip nur einmal liken, jede IP auch nur einmal
+    # (bestehende Datenbanken bekommen sie über app/database/schema.py)
     __table_args__ = (
-        Index('ix_user_clip_ip', 'user_id', 'clip_id', 'ip_address', unique=True),
+        Index('ix_user_clip_likes_user_clip', 'user_id', 'clip_id', unique=True),
+        Index('ix_user_clip_likes_clip_ip', 'clip_id', 'ip_address', unique=True),
+        # Keyset-Paginierung von /clip/my_liked_clips ohne sort (zuletzt geliked zuerst)
+        Index('ix_user_clip_likes_user_liked_at', 'user_id', 'liked_at', 'id'),
     )
 
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.routes.user import get_current_user
 from app.database.db_connection import get_db
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app.user_func import get_db_user
 from app.models.challanges import Challenge, Section, Item, SubChallenge
 from pydantic import BaseModel, field_validator, Field
@@ -9,7 +10,9 @@ from typing import List, Optional
 from datetime import datetime
 from app.routes.user import check_access_by_role
 from app.utils.time_tracking_logger import log_request_duration, logger
-from sqlalchemy import update
+from app.utils.response_cache import challenge_list_cache
+from app.utils.json_snapshot import JsonSnapshot
+from sqlalchemy import update, select
 
 class SubItemBase(BaseModel):
     id: Optional[str] = None
@@ -122,10 +125,10 @@ router = APIRouter(
 @log_request_duration
 async def create_challenge(
     challenge: ChallengeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     check_access_by_role(db_user.role, [0, 1, 2])
     try:
         logger.info(f"Versuche Challenge zu erstellen: {challenge}")
@@ -143,7 +146,7 @@ async def create_challenge(
             challange_end=datetime.strptime(challenge.header.challange_end, '%Y-%m-%d').date()
         )
         db.add(new_challenge)
-        db.flush()  # ID generieren
+        await db.flush()  # ID generieren
 
         # Sections mit Items und Subchallenges erstellen
         for section_data in challenge.sections:
@@ -152,7 +155,7 @@ async def create_challenge(
                 title=section_data.title
             )
             db.add(section)
-            db.flush()
+            await db.flush()
 
             for item_data in section_data.items:
                 item = Item(
@@ -161,7 +164,7 @@ async def create_challenge(
                     completed=item_data.completed
                 )
                 db.add(item)
-                db.flush()
+                await db.flush()
 
                 for sub_data in item_data.subchallenges:
                     sub = SubChallenge(
@@ -171,65 +174,100 @@ async def create_challenge(
                     )
                     db.add(sub)
         
-        db.commit()
+        await db.commit()
+        challenge_list_cache.bump()
         return {
             "message": "Challenge erfolgreich erstellt",
             "challenge_id": new_challenge.id
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Fehler beim Erstellen der Challenge: {str(e)}"
         )
 
+async def build_challenge_list(db: AsyncSession) -> list[dict]:
+    """
+    Baut die Antwort für /challenge/all (Format wie ChallengeResponse) direkt
+    aus den Zeilen einer Abfrage, ohne ORM-Objekte und Pydantic-Modelle.
+    """
+    rows = (await db.execute(
+        select(
+            Challenge.id.label("challenge_id"),
+            Challenge.title.label("challenge_title"),
+            Challenge.description,
+            Challenge.created_at,
+            Challenge.challange_end,
+            Section.id.label("section_id"),
+            Section.title.label("section_title"),
+            Item.id.label("item_id"),
+            Item.text.label("item_text"),
+            Item.completed.label("item_completed"),
+            SubChallenge.id.label("sub_id"),
+            SubChallenge.text.label("sub_text"),
+            SubChallenge.completed.label("sub_completed"),
+        )
+        .outerjoin(Section, Section.challenge_id == Challenge.id)
+        .outerjoin(Item, Item.section_id == Section.id)
+        .outerjoin(SubChallenge, SubChallenge.item_id == Item.id)
+        .order_by(Challenge.id, Section.id, Item.id, SubChallenge.id)
+    )).all()
+
+    challenges, sections, items = {}, {}, {}
+    for row in rows:
+        challenge = challenges.get(row.challenge_id)
+        if challenge is None:
+            challenge = challenges[row.challenge_id] = {
+                "id": str(row.challenge_id),
+                "header": {
+                    "title": row.challenge_title,
+                    "description": row.description,
+                    "created_at": row.created_at.strftime('%Y-%m-%d'),
+                    "challange_end": row.challange_end.strftime('%Y-%m-%d'),
+                },
+                "sections": [],
+            }
+        if row.section_id is None:
+            continue
+
+        section = sections.get(row.section_id)
+        if section is None:
+            section = sections[row.section_id] = {"id": str(row.section_id), "title": row.section_title, "items": []}
+            challenge["sections"].append(section)
+        if row.item_id is None:
+            continue
+
+        item = items.get(row.item_id)
+        if item is None:
+            item = items[row.item_id] = {
+                "id": str(row.item_id),
+                "text": row.item_text,
+                "completed": row.item_completed,
+                "subchallenges": [],
+            }
+            section["items"].append(item)
+        if row.sub_id is not None:
+            item["subchallenges"].append({"id": str(row.sub_id), "text": row.sub_text, "completed": row.sub_completed})
+
+    return list(challenges.values())
+
+
+# Zwischenspeicher dürfen die Liste halten, müssen aber per ETag nachfragen
+CHALLENGE_LIST_CACHE_CONTROL = "public, no-cache"
+
 # 📄 Alle Challenges abrufen
 @router.get("/all", response_model=List[ChallengeResponse])
-async def get_all_challenges(db: Session = Depends(get_db)):
+async def get_all_challenges(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build() -> JsonSnapshot:
+        return JsonSnapshot(await build_challenge_list(db))
+
     try:
-        challenges = db.query(Challenge).options(
-            joinedload(Challenge.sections)
-            .joinedload(Section.items)
-            .joinedload(Item.subchallenges)
-        ).all()
-        if not challenges:
+        # Aus dem Speicher, bis eine Challenge-Route schreibt; 304 per ETag ohne Abfrage
+        snapshot = await challenge_list_cache.get_or_build(("all",), build)
+        if not snapshot.count:
             raise HTTPException(status_code=404, detail="Keine Challenges gefunden")
-
-        return [
-            ChallengeResponse(
-                id=str(challenge.id),
-                header=HeaderResponse(
-                    title=challenge.title,
-                    description=challenge.description,
-                    created_at=challenge.created_at.strftime('%Y-%m-%d'),
-                    challange_end=challenge.challange_end.strftime('%Y-%m-%d')
-                ),
-                sections=[
-                    SectionResponse(
-                        id=str(section.id),
-                        title=section.title,
-                        items=[
-                            ItemResponse(
-                                id=str(item.id),
-                                text=item.text,
-                                completed=item.completed,
-                                subchallenges=[
-                                    SubItemResponse(
-                                        id=str(sub.id),
-                                        text=sub.text,
-                                        completed=sub.completed
-                                    )
-                                    for sub in item.subchallenges
-                                ]
-                            )
-                            for item in section.items
-                        ]
-                    )
-                    for section in challenge.sections
-                ]
-            )
-            for challenge in challenges
-        ]
+        return snapshot.response(request, CHALLENGE_LIST_CACHE_CONTROL)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -242,16 +280,16 @@ class ChallengePageResponse(BaseModel):
 async def update_task(
     task_id: int,
     taskdata: ChallengePageResponse,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     logger.info(f"/task/{task_id}: {current_user['display_name']} -> {taskdata.completed}[TRY]")
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     logger.info(f"/task/{task_id}: {current_user['display_name']} -> [USERFOUND]")
     check_access_by_role(db_user.role, [0, 1, 2])
     logger.info(f"/task/{task_id}: {current_user['display_name']} -> {taskdata.completed}[check_access_by_role -> PASS]")
     try:
-        result = db.execute(
+        result = await db.execute(
             update(Item)
             .where(Item.id == task_id)
             .values(completed=taskdata.completed)
@@ -260,11 +298,12 @@ async def update_task(
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Subchallenge nicht gefunden")
 
-        db.commit()
+        await db.commit()
+        challenge_list_cache.bump()
         logger.info(f"/task/{task_id} {current_user["display_name"]} -> {taskdata.completed}")
         return {"message": "Aufgabe erfolgreich aktualisiert"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Fehler beim Aktualisieren der Aufgbe: {str(e)}")
 
 
@@ -273,7 +312,7 @@ async def update_task(
 async def update_subchallenge(
     subchallenge_id: int,
     subtaskdata: ChallengePageResponse,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -282,7 +321,7 @@ async def update_subchallenge(
     Args:
         subchallenge_id (int): Die ID der Subchallenge, die aktualisiert werden soll.
         completed (bool): Der neue 'completed'-Status (True oder False).
-        db (Session, optional): Die Datenbank-Session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Die Datenbank-Session. Defaults to Depends(get_db).
         current_user (dict, optional): Die Informationen des aktuellen Benutzers. Defaults to Depends(get_current_user).
 
     Raises:
@@ -292,11 +331,11 @@ async def update_subchallenge(
     Returns:
         dict: Eine Nachricht, die bestätigt, dass die Subchallenge erfolgreich aktualisiert wurde.
     """
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     check_access_by_role(db_user.role, [0, 1, 2])
 
     try:
-        result = db.execute(
+        result = await db.execute(
             update(SubChallenge)
             .where(SubChallenge.id == subchallenge_id)
             .values(completed=subtaskdata.completed)
@@ -305,11 +344,12 @@ async def update_subchallenge(
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Subchallenge nicht gefunden")
 
-        db.commit()
+        await db.commit()
+        challenge_list_cache.bump()
         logger.info(f"/subchallenge/{subchallenge_id} {current_user["display_name"]} -> {subtaskdata.completed}")
         return {"message": "Subchallenge erfolgreich aktualisiert"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Fehler beim Aktualisieren der Subchallenge: {str(e)}")
 
 
@@ -319,18 +359,18 @@ async def update_subchallenge(
 async def update_challenge(
     challenge_id: int,
     challenge: ChallengeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     check_access_by_role(db_user.role, [0, 1, 2])
 
     # Challenge mit allen Beziehungen laden
-    db_challenge = db.query(Challenge).options(
+    db_challenge = (await db.scalars(select(Challenge).options(
         joinedload(Challenge.sections)
         .joinedload(Section.items)
         .joinedload(Item.subchallenges)
-    ).filter(Challenge.id == challenge_id).first()
+    ).where(Challenge.id == challenge_id))).unique().first()
 
     if not db_challenge:
         raise HTTPException(status_code=404, detail="Challenge nicht gefunden")
@@ -344,7 +384,7 @@ async def update_challenge(
 
         # Bestehende Sections löschen (cascade delete wird automatisch angewendet)
         for section in db_challenge.sections:
-            db.delete(section)
+            await db.delete(section)
         
         # Neue Sections erstellen
         for section_data in challenge.sections:
@@ -353,7 +393,7 @@ async def update_challenge(
                 title=section_data.title
             )
             db.add(new_section)
-            db.flush()
+            await db.flush()
 
             # Items erstellen
             for item_data in section_data.items:
@@ -363,7 +403,7 @@ async def update_challenge(
                     completed=item_data.completed
                 )
                 db.add(new_item)
-                db.flush()
+                await db.flush()
 
                 # Subchallenges erstellen
                 for sub_data in item_data.subchallenges:
@@ -374,10 +414,11 @@ async def update_challenge(
                     )
                     db.add(new_sub)
 
-        db.commit()
+        await db.commit()
+        challenge_list_cache.bump()
         return {"message": "Challenge erfolgreich aktualisiert"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Fehler beim Aktualisieren der Challenge: {str(e)}"
@@ -388,15 +429,15 @@ async def update_challenge(
 @router.delete("/delete/{challenge_id}")
 async def delete_challenge(
     challenge_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     check_access_by_role(db_user.role, [0, 1, 2])
 
     try:
         # 1. Challenge abrufen
-        challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
+        challenge = await db.scalar(select(Challenge).where(Challenge.id == challenge_id))
         if not challenge:
             raise HTTPException(status_code=404, detail="Challenge nicht gefunden")
 
@@ -419,16 +460,17 @@ async def delete_challenge(
         # db.delete(challenge)
 
         # Simplified approach with PostgreSQL
-        challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
+        challenge = await db.scalar(select(Challenge).where(Challenge.id == challenge_id))
         if not challenge:
             raise HTTPException(status_code=404, detail="Challenge nicht gefunden")
 
         # Just delete the challenge - the rest will cascade automatically
-        db.delete(challenge)
+        await db.delete(challenge)
    
-        db.commit()
+        await db.commit()
+        challenge_list_cache.bump()
         return {"message": "Challenge erfolgreich gelöscht"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Löschen: {str(e)}")
 
@@ -6,21 +6,20 @@ from fastapi import (
     Depends, 
     HTTPException, 
     Request,
+    Response,
     Query
 )
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_
+from typing import Literal
+from datetime import datetime, timezone
 
 from app.database.db_connection import get_db
-from app.twitch_func import (
-    generate_access_token, 
-    get_broadcaster_id, 
-    get_clips_from_twitch
-)
-from app.clip_func import (
-    save_clip_if_not_exists
-)
+from app.clip_sync import clip_sync_service
+from app.clip_func import insert_like
+from app.like_buffer import like_buffer
+from app.clip_catalog import clip_catalog, ClipCatalogConfig
 from app.models import (
     User, UserClipLike, Clip, BlockedClips
 )
@@ -28,6 +27,9 @@ from app.user_func import get_db_user
 
 from app.utils.time_tracking_logger import log_request_duration, logger
 from app.utils.display_client_data import Client
+from app.utils.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from app.utils.response_cache import clip_list_cache, liked_clips_cache
+from app.utils.json_snapshot import clip_snapshots, JsonSnapshot
 
 router = APIRouter(
     prefix="/clip",
@@ -36,48 +38,24 @@ router = APIRouter(
 )
 
 
-@router.post("/sync_clips")
+@router.post("/sync_clips", status_code=202)
 @log_request_duration
-async def sync_clips(request: Request, db: Session = Depends(get_db)):
+async def sync_clips(request: Request, full: bool = False):
       
     client = Client(request)
     
     logger.info(f"Anfrage für '/sync_clips' empfangen von IP: {client.client_ip} - {client.full_url}")
 
-    broadcaster_username = "miwitv"
-
-    access_token = generate_access_token()
-
-    broadcaster_id = get_broadcaster_id(broadcaster_username, access_token)
-    if not broadcaster_id:
-        logger.error(f"Broadcaster {broadcaster_username} nicht gefunden.")
-        raise HTTPException(status_code=400, detail="Broadcaster not found")
-
-    clips = get_clips_from_twitch(broadcaster_id, access_token)
-    if not clips:
-        logger.warning(f"Keine Clips für Broadcaster {broadcaster_username} gefunden.")
-        raise HTTPException(status_code=404, detail="No clips found")
-    
-    logger.info("Clips Synchronisation initiiert.")
-    # Alle Clip-IDs von Twitch extrahieren
-    twitch_clip_ids = {clip['id'] for clip in clips}
-    # Alle Clips aus der Datenbank abrufen
-    db_clips = db.query(Clip).filter(Clip.broadcaster_id == broadcaster_id).all()
-
-    # Prüfen, ob Clips aus der DB noch auf Twitch existieren
-    for db_clip in db_clips:
-        if db_clip.clip_id not in twitch_clip_ids:
-            # Lösche alle Likes für diesen Clip
-            db.query(UserClipLike).filter(UserClipLike.clip_id == db_clip.id).delete()
-
-            # Lösche den Clip aus der Datenbank
-            db.delete(db_clip)
-            logger.info(f"Clip {db_clip.clip_id} aus der Datenbank gelöscht.")
+    # Der Sync läuft im Hintergrund; Fortschritt und Ergebnis unter /clip/sync_status
+    queued = clip_sync_service.request(full=full)
+    logger.info("Clips Synchronisation eingeplant." if queued else "Clips Synchronisation bereits eingeplant.")
 
-    for clip in clips:
-        save_clip_if_not_exists(clip, broadcaster_id, db=db)
+    return {"message": "Clips Synchronisation eingeplant", "queued": queued}
 
-    return {"message": "Clips synchronisiert"}
+@router.get("/sync_status")
+@log_request_duration
+async def sync_status(request: Request):
+    return clip_sync_service.status()
 
 class ClipResponse(BaseModel):
     creator_name: str
@@ -91,98 +69,280 @@ class ClipResponse(BaseModel):
     class Config:
         from_attributes = True # Erlaubt die Konvertierung von SQLAlchemy Modellen
 
+# Sortierungen für die Clip-Listen; jede hat einen Index (Spalte, id)
+CLIP_SORT_COLUMNS = {
+    "likes": Clip.likes,
+    "view_count": Clip.view_count,
+    "created_at": Clip.created_at,
+}
+ClipSort = Literal["likes", "view_count", "created_at"]
+MAX_PAGE_SIZE = 100
+# Zwischenspeicher dürfen die Listen halten, müssen aber per ETag nachfragen (304 ohne Body)
+CLIP_LIST_CACHE_CONTROL = "public, no-cache"
+LIKED_CLIPS_CACHE_CONTROL = "private, no-cache"
+
+
+def parse_sort_value(sort: str, value):
+    try:
+        if sort not in ("created_at", "liked_at"):
+            return int(value)
+        created_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # clips.created_at und user_clip_likes.liked_at sind naive UTC; ein Cursor mit Zeitzone wird angeglichen
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def apply_clip_keyset(query, sort: str, cursor: str | None, limit: int):
+    """
+    Sortiert absteigend nach (Spalte, id) und setzt nach dem Cursor fort
+    (Keyset statt OFFSET: jede Seite kostet gleich viel).
+    """
+    sort_column = CLIP_SORT_COLUMNS[sort]
+    if cursor:
+        value, last_id = decode_cursor(cursor, 2)
+        query = query.where(
+            tuple_(sort_column, Clip.id) < tuple_(parse_sort_value(sort, value), parse_sort_value("id", last_id))
+        )
+    return query.order_by(sort_column.desc(), Clip.id.desc()).limit(limit + 1)
+
+
+def apply_liked_keyset(query, cursor: str | None, limit: int):
+    """
+    Wie apply_clip_keyset, aber nach (liked_at, id) des Likes: zuletzt geliked
+    zuerst, passend zum Index ix_user_clip_likes_user_liked_at.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, 2)
+        query = query.where(
+            tuple_(UserClipLike.liked_at, UserClipLike.id)
+            < tuple_(parse_sort_value("liked_at", value), parse_sort_value("id", last_id))
+        )
+    return query.order_by(UserClipLike.liked_at.desc(), UserClipLike.id.desc()).limit(limit + 1)
+
+
+def clip_list_query():
+    """
+    Eine Abfrage für die Clip-Listen: Ersteller per JOIN, Likes aus clips.likes.
+    Es werden nur die benötigten Spalten geladen, keine ORM-Objekte.
+    """
+    return (
+        select(
+            Clip.id,
+            Clip.clip_id,
+            User.display_name.label("creator_name"),
+            Clip.view_count,
+            Clip.created_at,
+            Clip.likes,
+            Clip.thumbnail_url,
+        )
+        .join(User, Clip.creator_id == User.id)
+    )
+
+
+# Clip ist blockiert (ein Eintrag pro Clip, siehe block_or_unblock_clip)
+clip_is_blocked = (
+    select(BlockedClips.id)
+    .where(BlockedClips.clip_id == Clip.id, BlockedClips.status == True)
+    .exists()
+)
+
+
+def clip_row_to_dict(row) -> dict:
+    return {
+        "id": row.clip_id,
+        "creator_name": row.creator_name,
+        "view_count": row.view_count,
+        "created_at": row.created_at.isoformat(),
+        "likes": row.likes,
+        "thumbnail_url": row.thumbnail_url,
+    }
+
+
+def clip_cursor(clip, sort: str) -> str:
+    value = getattr(clip, sort)
+    return encode_cursor([value.isoformat() if sort == "created_at" else value, clip.id])
+
+
 @router.get("/my_liked_clips")
 @log_request_duration
 async def get_my_liked_clips(
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    sort: ClipSort | None = Query(None, description="Sortierung (absteigend); ohne: zuletzt geliked zuerst"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Seitengröße; ohne: alle Clips"),
+    cursor: str | None = Query(None, description="Cursor aus X-Next-Cursor der vorherigen Seite"),
 ):
     """
     Gibt alle Clips vom aktuellen Benutzer zurück.
 
     Args:
-        db (Session): Datenbank-Session.
+        db (AsyncSession): Datenbank-Session.
         current_user (dict): Der aktuell angemeldete Benutzer.
+        sort (str): likes, view_count oder created_at.
+        limit (int): Seitengröße; der Cursor der nächsten Seite steht in X-Next-Cursor.
+        cursor (str): Cursor der vorherigen Seite.
 
     Returns:
         list[ClipResponse]: Eine Liste von Clips, die von dem Benutzer geliked wurden.
     """
 
-    # Benutzerid aus dem JWT-Token und den Benutzer aus der Datenbank abrufen
+    # Benutzerid aus dem JWT-Token; die Datenbank nur fragen, wenn die Liste nicht im Speicher ist
     user_db_id = current_user.get("user_id")
-    user = db.query(User).filter(User.id == user_db_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    logger.info(f"Benutzer {user.display_name +" : "+ user.twitch_id} ruft seine clips auf.")
+    logger.info(f"Benutzer {current_user.get("display_name")} ({user_db_id}) ruft seine clips auf.")
 
+    async def build():
+        user = await db.scalar(select(User).where(User.id == user_db_id))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return await build_liked_clip_list(db, user.id, sort, limit, cursor)
+
+    # Likes und Sync erhöhen die Version; ein passendes If-None-Match kostet so keine Abfrage
+    snapshot, next_cursor = await liked_clips_cache.get_or_build((user_db_id, sort, limit, cursor), build)
+    logger.info(f"Benutzer {current_user.get("display_name")} ({user_db_id}) hat {snapshot.count} Clips aufgerufen.")
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return snapshot.response(request, LIKED_CLIPS_CACHE_CONTROL, headers)
+
+async def build_liked_clip_list(db: AsyncSession, user_id: int, sort: str | None, limit: int | None, cursor: str | None):
+    """
+    Baut die Antwort für /clip/my_liked_clips.
+
+    Returns:
+        tuple[JsonSnapshot, str | None]: Clips und Cursor der nächsten Seite.
+    """
     # Erstellt eine Joint zwischen UserClipLike und Clip, um die Clips zu erhalten, die der Benutzer geliked hat
-    liked_clips = (
-        db.query(Clip)
-        .join(UserClipLike)
-        .filter(UserClipLike.user_id == user.id)
-        .order_by(UserClipLike.liked_at.desc())
-        .all()
+    query = (
+        clip_list_query()
+        .join(UserClipLike, UserClipLike.clip_id == Clip.id)
+        .where(UserClipLike.user_id == user_id)
     )
+    next_cursor = None
+    if limit is None:
+        # Ohne limit: vollständige Liste wie bisher
+        order = (
+            (CLIP_SORT_COLUMNS[sort].desc(), Clip.id.desc()) if sort
+            else (UserClipLike.liked_at.desc(), UserClipLike.id.desc())
+        )
+        rows = (await db.execute(query.order_by(*order))).all()
+    elif sort:
+        rows = (await db.execute(apply_clip_keyset(query, sort, cursor, limit))).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = clip_cursor(rows[-1], sort)
+    else:
+        # Ohne sort auch seitenweise zuletzt geliked zuerst
+        query = query.add_columns(UserClipLike.liked_at, UserClipLike.id.label("like_id"))
+        rows = (await db.execute(apply_liked_keyset(query, cursor, limit))).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].liked_at.isoformat(), rows[-1].like_id])
+
+    return JsonSnapshot([clip_row_to_dict(row) for row in rows]), next_cursor
+
+async def build_clip_list_from_catalog(db: AsyncSession, show_blocked: bool, sort: str | None, limit: int | None, cursor: str | None):
+    """Wie build_clip_list, aber aus dem Clip-Katalog im Speicher statt aus der Datenbank."""
+    await clip_catalog.ensure_loaded(db)
+    after = None
+    if limit is not None and cursor:
+        value, last_id = decode_cursor(cursor, 2)
+        after = (parse_sort_value(sort or "created_at", value), parse_sort_value("id", last_id))
+
+    records, last = clip_catalog.list(show_blocked, sort, limit, after)
+    next_cursor = clip_cursor(last, sort or "created_at") if last else None
+    return [record.to_dict(show_blocked) for record in records], next_cursor
+
+async def build_clip_list(db: AsyncSession, show_blocked: bool, sort: str | None, limit: int | None, cursor: str | None):
+    """
+    Baut die Antwort für /clip/all.
+
+    Returns:
+        tuple[list, str | None]: Clips und Cursor der nächsten Seite.
+    """
+    if ClipCatalogConfig.ENABLED:
+        return await build_clip_list_from_catalog(db, show_blocked, sort, limit, cursor)
+
+    query = clip_list_query()
+    if show_blocked:
+        # Block-Status in derselben Abfrage statt einer Abfrage pro Clip
+        query = query.add_columns(clip_is_blocked.label("blocked"))
+    else:
+        # Wenn show_blocked=False, dann blockierte Clips ausfiltern
+        query = query.where(~clip_is_blocked)
+
+    next_cursor = None
+    if limit is None:
+        # Ohne limit: vollständige Liste wie bisher
+        if sort:
+            query = query.order_by(CLIP_SORT_COLUMNS[sort].desc(), Clip.id.desc())
+        rows = (await db.execute(query)).all()
+    else:
+        rows = (await db.execute(apply_clip_keyset(query, sort or "created_at", cursor, limit))).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = clip_cursor(rows[-1], sort or "created_at")
 
     result = []
-    for clip in liked_clips:
-        result.append({
-            "id": clip.clip_id,
-            "creator_name": clip.creator.display_name,
-            "view_count": clip.view_count,
-            "created_at": clip.created_at.isoformat(),
-            "likes": clip.calculate_likes(db),
-            "thumbnail_url": clip.thumbnail_url,
-        })
-    logger.info(f"Benutzer {user.display_name +" : "+ user.twitch_id} hat {len(result)} Clips aufgerufen.")
-
-    return result
+    for row in rows:
+        clip = clip_row_to_dict(row)
+        # None, wenn blockierte Clips nicht angezeigt werden
+        clip["blocked"] = row.blocked if show_blocked else None
+        result.append(clip)
+    return result, next_cursor
+
+async def build_clip_page(db: AsyncSession, show_blocked: bool, sort: str | None, limit: int, cursor: str | None):
+    result, next_cursor = await build_clip_list(db, show_blocked, sort, limit, cursor)
+    return JsonSnapshot(result), next_cursor
+
+async def get_clip_list_snapshot(request: Request, db: AsyncSession, show_blocked: bool, sort: str | None) -> Response:
+    async def build() -> list:
+        result, _ = await build_clip_list(db, show_blocked, sort, None, None)
+        return result
+
+    snapshot = await clip_snapshots.get((show_blocked, sort), build)
+    if not snapshot.count:
+        raise HTTPException(status_code=404, detail="No clips found")
+
+    logger.info(f"Es wurden {snapshot.count} Clips abgerufen (Snapshot).")
+    return snapshot.response(request, CLIP_LIST_CACHE_CONTROL)
 
 @router.get("/all")
 @log_request_duration
 async def get_all_clips(
     request: Request,
-    db: Session = Depends(get_db),
-    show_blocked: bool = Query(False, description="Zeige blockierte Clips")
+    db: AsyncSession = Depends(get_db),
+    show_blocked: bool = Query(False, description="Zeige blockierte Clips"),
+    sort: ClipSort | None = Query(None, description="Sortierung (absteigend)"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Seitengröße; ohne: alle Clips"),
+    cursor: str | None = Query(None, description="Cursor aus X-Next-Cursor der vorherigen Seite"),
     ):
-    query = db.query(Clip).options(joinedload(Clip.creator))
-    # Wenn show_blocked=False, dann blockierte Clips ausfiltern
-    if not show_blocked:
-        blocked_clip_ids = select(BlockedClips.clip_id).where(BlockedClips.status == True)
-        query = query.filter(~Clip.id.in_(blocked_clip_ids))  # Clips ausschließen
-    
-    clips = query.all()
+    if limit is None:
+        # Vollständige Liste: fertige JSON-Bytes ohne ORM und ohne erneutes Encoding
+        return await get_clip_list_snapshot(request, db, show_blocked, sort)
+
+    # Wiederholte Aufrufe kommen aus dem Speicher, bis Likes/Blockierungen/Sync die Version erhöhen
+    snapshot, next_cursor = await clip_list_cache.get_or_build(
+        ("all", show_blocked, sort, limit, cursor),
+        lambda: build_clip_page(db, show_blocked, sort, limit, cursor),
+    )
 
-    if not clips:
+    # Eine leere Folgeseite ist kein Fehler
+    if not snapshot.count and not cursor:
         raise HTTPException(status_code=404, detail="No clips found")
-    
-    result = []
-    for clip in clips:
-        likes_count = clip.calculate_likes(db)
-        block_status = None
-        if show_blocked:
-            block_status_query = db.query(BlockedClips).filter(BlockedClips.clip_id == clip.id).first()
-            block_status = block_status_query.status if block_status_query else False  # False wenn nicht blockiert
-        
-        result.append({
-            "id": clip.clip_id,
-            "creator_name": clip.creator.display_name,
-            "view_count": clip.view_count,
-            "created_at": clip.created_at.isoformat(),
-            "likes": likes_count,
-            "blocked": block_status,
-            "thumbnail_url": clip.thumbnail_url,
-        })
-    logger.info(f"Es wurden {len(result)} Clips abgerufen.")
-    return result
+
+    logger.info(f"Es wurden {snapshot.count} Clips abgerufen.")
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return snapshot.response(request, CLIP_LIST_CACHE_CONTROL, headers)
 
 @router.post("/like/{clip_id}")
 @log_request_duration
 async def like_clip(
     clip_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)  # Authentifizierter Benutzer
 ):
     """
@@ -191,7 +351,7 @@ async def like_clip(
     Args:
         clip_id (str): The ID of the clip to like.
         request (Request): The HTTP request object for retrieving the IP address.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
         current_user (User): Authenticated user retrieved from JWT or session.
 
     Returns:
@@ -201,61 +361,45 @@ async def like_clip(
     user_name = current_user["display_name"]
     user_id = current_user["user_id"]
 
-    # Clip prüfen
-    clip = db.query(Clip).filter(Clip.clip_id == clip_id).first()
-    if not clip:
+    try:
+        if like_buffer.running and not like_buffer.full:
+            # Gepufferter Modus: sofort bestätigen, gesammelt schreiben
+            like = await like_buffer.add(clip_id, user_id, user_ip, db)
+        else:
+            # Clip prüfen, Like speichern und neue Anzahl lesen: ein Statement, eine Transaktion
+            like = await insert_like(clip_id, user_id, user_ip, db)
+            await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Etwas ist schiefgelaufen routes.clip -> 160")
+
+    if like is None:
         raise HTTPException(status_code=404, detail="Clip not found")
 
     # Verhindern, dass ein Nutzer seinen eigenen Clip liked
-    if clip.creator_id == user_id:
+    if like["creator_id"] == user_id:
         raise HTTPException(status_code=403, detail={"message": "Du kannst deinen eigenen Clip nicht liken."})
 
-    # 1. User darf denselben Clip nicht doppelt liken (unabhängig von der IP)
-    existing_like_by_user = db.query(UserClipLike).filter_by(
-        user_id=user_id,
-        clip_id=clip.id
-    ).first()
-
-    if existing_like_by_user:
+    if not like["inserted"]:
+        # 2. Verhindere mehrere Accounts von derselben IP den gleichen Clip zu liken
+        if like["liked_by_ip"] and not like["liked_by_user"]:
+            logger.warning(f"User {user_name} versucht denselben Clip von derselben IP zu liken.")
+            raise HTTPException(status_code=400, detail={"message": "Von dieser IP wurde dieser Clip bereits geliked."})
+        # 1. User darf denselben Clip nicht doppelt liken (unabhängig von der IP)
         raise HTTPException(status_code=400, detail={"message": "Du hast diesen Clip bereits geliked."})
 
-    # 2. Verhindere mehrere Accounts von derselben IP den gleichen Clip zu liken
-    existing_like_by_ip = db.query(UserClipLike).filter_by(
-        clip_id=clip.id,
-        ip_address=user_ip
-    ).first()
-
-    if existing_like_by_ip:
-        logger.warning(f"User {user_name} versucht denselben Clip von derselben IP zu liken.")
-        raise HTTPException(status_code=400, detail={"message": "Von dieser IP wurde dieser Clip bereits geliked."})
-
-    # Like speichern
-    new_like = UserClipLike(
-        user_id=user_id,
-        clip_id=clip.id,
-        ip_address=user_ip,
-    )
-    try:
-        db.add(new_like)
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(status_code=400, detail="Etwas ist schiefgelaufen routes.clip -> 160")
-
-    # Optional: Anzahl der Likes im Clip aktualisieren
-    clip.likes += 1
-    db.commit()
-    
+    clip_catalog.set_likes(clip_id, like["likes"])
+    clip_list_cache.bump()
+    liked_clips_cache.bump()
     logger.info(f"Clip {clip_id} von {user_name, user_id, user_ip} geliked.")
-    updated_likes = clip.calculate_likes(db)
-    return {"message": "Clip liked successfully", "likes": updated_likes}
+    return {"message": "Clip liked successfully", "likes": like["likes"]}
 
 @router.post("/block/{clip_id}")
 @log_request_duration
 async def block_or_unblock_clip(
     clip_id: str,
     status: bool = Body(..., embed=True, description="True = blockieren, False = entsperren"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -264,7 +408,7 @@ async def block_or_unblock_clip(
     Args:
         clip_id (str): Die Clip-ID.
         status (bool): True = blockieren, False = entsperren.
-        db (Session): Datenbank-Session.
+        db (AsyncSession): Datenbank-Session.
         current_user (User): Der aktuell angemeldete Benutzer.
 
     Returns:
@@ -272,17 +416,17 @@ async def block_or_unblock_clip(
     """
 
     # Clip prüfen
-    clip = db.query(Clip).filter(Clip.clip_id == clip_id).first()
+    clip = await db.scalar(select(Clip).where(Clip.clip_id == clip_id))
     if not clip:
         logger.warning(f"{current_user["display_name"]} hat versucht Clip: {clip_id} zu blockieren, der nicht existiert.")
         raise HTTPException(status_code=404, detail={"message": "Clip nicht gefunden."})
 
     roles = [0, 1, 2]
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     check_access_by_role(db_user.role, roles)
 
     # Überprüfen, ob der Clip schon blockiert wurde
-    blocked_entry = db.query(BlockedClips).filter(BlockedClips.clip_id == clip.id).first()
+    blocked_entry = await db.scalar(select(BlockedClips).where(BlockedClips.clip_id == clip.id))
 
     if blocked_entry:
         # Status aktualisieren
@@ -297,7 +441,9 @@ async def block_or_unblock_clip(
         )
         db.add(new_block)
 
-    db.commit()
+    await db.commit()
+    clip_catalog.set_blocked(clip.id, status)
+    clip_list_cache.bump()
 
     action = "blockiert" if status else "freigegeben"
     logger.info(f"Clip {clip_id} wurde von {current_user["display_name"]} erfolgreich {action}.")
@@ -1,7 +1,9 @@
 from app.models.user import User
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from app.token import decode_jwt, TokenExpiredError, InvalidTokenError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.db_connection import get_db 
 from typing import Annotated, List
 from app.user_func import get_db_user
@@ -16,7 +18,7 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 def get_current_user(request: Request):
     token = request.cookies.get("access_token")
@@ -34,13 +36,13 @@ def get_current_user(request: Request):
 @log_request_duration
 async def get_user_data(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     user_db_id = current_user.get("user_id")
     if not user_db_id: return {"message": "Not authenticated"}
     logger.info(f"user {current_user["display_name"]} requested his own data") 
-    db_user = get_db_user(db, user_db_id)
+    db_user = await get_db_user(db, user_db_id)
     # return userinfo dict 
 
     return {
@@ -78,15 +80,15 @@ class UserUpdate(BaseModel):
 async def update_user(
     request: Request,
     user_update: UserUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     # Prüfen, ob der aktuelle Benutzer admin oder eine ähnliche Rolle hat
-    db_user = get_db_user(db, user_db_id=current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id=current_user.get("user_id"))
     check_access_by_role(db_user.role, [0])
 
     # Zielbenutzer aus der Datenbank abrufen
-    user = db.query(User).filter(User.id == user_update.id).first()
+    user = await db.scalar(select(User).where(User.id == user_update.id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -95,8 +97,8 @@ async def update_user(
     user.role = user_update.role
     user.is_active = user_update.is_active
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     # Rückgabe, die das Frontend benötigt
     return {"message": f"{user.display_name} erfolgreich bearbeitet!", "user": user}
 
@@ -120,16 +122,30 @@ class UserOut(BaseModel):
 @log_request_duration
 async def get_all_user(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    db_user = get_db_user(db, user_db_id = current_user.get("user_id"))
+    db_user = await get_db_user(db, user_db_id = current_user.get("user_id"))
     # Rollenprüfung
 
     check_access_by_role(db_user.role, [0, 1]) 
 
-    # Abruf aller Benutzer aus der Datenbank
-    users = db.query(User).filter(User.email.isnot(None)).all()
-
-    # Rückgabe aller Benutzer
-    return users
\ No newline at end of file
+    # Abruf aller Benutzer aus der Datenbank (nur die Spalten von UserOut, keine ORM-Objekte)
+    rows = (await db.execute(
+        select(User.id, User.twitch_id, User.email, User.display_name, User.role, User.is_active, User.created_at)
+        .where(User.email.isnot(None))
+    )).all()
+
+    # Rückgabe aller Benutzer direkt als JSON, ohne UserOut pro Zeile
+    return ORJSONResponse([
+        {
+            "id": row.id,
+            "twitch_id": int(row.twitch_id),
+            "email": row.email,
+            "display_name": row.display_name,
+            "role": row.role,
+            "is_active": row.is_active,
+            "created_at": row.created_at,
+        }
+        for row in rows
+    ])
\ No newline at end of file
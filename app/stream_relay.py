@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import psycopg
+from app.database.db_connection import CONNINFO
+from app.stream_status import StreamStatusPoller, StreamStatusHub, stream_hub
+from app.utils.time_tracking_logger import logger
+
+
+class StreamRelayConfig:
+    ENABLED = os.getenv("STREAM_RELAY_ENABLED", "true").lower() == "true"
+    # NOTIFY-Kanäle
+    STATUS_CHANNEL = "miwi_stream_status"
+    WATCH_CHANNEL = "miwi_stream_watch"
+    # Schlüssel für pg_try_advisory_lock: wer ihn hält, ist der Poller
+    LEADER_LOCK_ID = 7_250_001
+    # Jeder Worker meldet seine Channels so oft (Sekunden)
+    ANNOUNCE_INTERVAL = 10
+    # Meldungen verfallen, wenn ein Worker so lange nichts mehr sendet (Sekunden)
+    WATCH_TTL = 35
+    RETRY_INTERVAL = 5
+    # NOTIFY-Payloads sind auf 8000 Bytes begrenzt
+    MAX_PAYLOAD = 7000
+
+
+class PostgresStreamRelay:
+    """
+    Verteilt Stream-Statuswechsel über Postgres LISTEN/NOTIFY an alle Worker.
+
+    Jeder Worker meldet per NOTIFY, welche Channels bei ihm beobachtet werden.
+    Genau ein Worker (der den Advisory Lock hält) fragt die Vereinigung aller
+    Channels bei Twitch ab und veröffentlicht Statuswechsel; alle Worker
+    empfangen sie per LISTEN und verteilen sie an ihre lokalen WebSockets.
+    Fällt die Verbindung aus, pollt jeder Worker wieder selbst.
+    """
+
+    def __init__(self, hub: StreamStatusHub):
+        self.hub = hub
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.listen_conn: psycopg.AsyncConnection | None = None
+        self.notify_conn: psycopg.AsyncConnection | None = None
+        self.is_leader = False
+        self.announce_event = asyncio.Event()
+        # Nur beim Leader: Meldung -> (Channels, gültig bis)
+        self.watchers: dict[str, tuple[set[str], float]] = {}
+        self.last_status: dict[str, dict | None] = {}
+        self.poller = StreamStatusPoller(self.watched_channels, self.publish_status)
+        self.task: asyncio.Task | None = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run(), name="stream-relay")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def announce(self):
+        """Meldet die lokalen Channels sofort statt erst beim nächsten Intervall."""
+        self.announce_event.set()
+
+    async def run(self):
+        while True:
+            try:
+                await self.connect()
+                await self.hub.set_relay(self)
+                logger.info(f"Stream relay connected as {self.worker_id}")
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(self.listen())
+                    group.create_task(self.announce_loop())
+                    group.create_task(self.leader_loop())
+            except asyncio.CancelledError:
+                await self.disconnect()
+                raise
+            except Exception as e:
+                logger.warning(f"Stream relay disconnected, falling back to local polling: {str(e)}")
+            await self.disconnect()
+            await self.hub.set_relay(None)
+            await asyncio.sleep(StreamRelayConfig.RETRY_INTERVAL)
+
+    async def connect(self):
+        self.listen_conn = await psycopg.AsyncConnection.connect(CONNINFO, autocommit=True)
+        self.notify_conn = await psycopg.AsyncConnection.connect(CONNINFO, autocommit=True)
+        await self.listen_conn.execute(f"LISTEN {StreamRelayConfig.STATUS_CHANNEL}")
+        await self.listen_conn.execute(f"LISTEN {StreamRelayConfig.WATCH_CHANNEL}")
+
+    async def disconnect(self):
+        await self.poller.stop()
+        if self.is_leader:
+            logger.info("Stream relay leadership released")
+        self.is_leader = False
+        self.watchers.clear()
+        self.last_status.clear()
+        # Schließen der Verbindung gibt auch den Advisory Lock frei
+        for conn in (self.listen_conn, self.notify_conn):
+            if conn is not None:
+                try:
+                    await conn.close()
+                except Exception:
+                    pass
+        self.listen_conn = None
+        self.notify_conn = None
+
+    async def notify(self, channel: str, payload: str):
+        await self.notify_conn.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+
+    async def listen(self):
+        async for notify in self.listen_conn.notifies():
+            message = json.loads(notify.payload)
+            if notify.channel == StreamRelayConfig.STATUS_CHANNEL:
+                await self.hub.deliver(message["user_login"], message["data"])
+            elif self.is_leader:
+                await self.update_watchers(message)
+
+    async def announce_loop(self):
+        while True:
+            self.announce_event.clear()
+            for part, channels in enumerate(self.announcement_parts()):
+                # Channels ohne bekannten Status: der Leader sendet ihn erneut
+                pending = [
+                    login for login in channels
+                    if login in self.hub.channels and self.hub.channels[login].status is None
+                ]
+                payload = json.dumps({"worker": f"{self.worker_id}#{part}", "channels": channels, "pending": pending})
+                await self.notify(StreamRelayConfig.WATCH_CHANNEL, payload)
+            try:
+                await asyncio.wait_for(self.announce_event.wait(), timeout=StreamRelayConfig.ANNOUNCE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def announcement_parts(self) -> list[list[str]]:
+        """Teilt die lokalen Channels so auf, dass jede Meldung in ein NOTIFY passt."""
+        parts, current, size = [], [], 0
+        for user_login in self.hub.watched_channels():
+            if current and size + len(user_login) + 4 > StreamRelayConfig.MAX_PAYLOAD:
+                parts.append(current)
+                current, size = [], 0
+            current.append(user_login)
+            size += len(user_login) + 4
+        parts.append(current)
+        return parts
+
+    async def leader_loop(self):
+        while True:
+            if not self.is_leader:
+                cursor = await self.notify_conn.execute(
+                    "SELECT pg_try_advisory_lock(%s)", (StreamRelayConfig.LEADER_LOCK_ID,)
+                )
+                if (await cursor.fetchone())[0]:
+                    self.is_leader = True
+                    logger.info(f"Stream relay leadership acquired by {self.worker_id}")
+                    self.poller.start()
+                    self.announce()
+            else:
+                # Abgelaufene Meldungen (z.B. beendete Worker) entfernen
+                now = time.monotonic()
+                for key, (_, expires_at) in list(self.watchers.items()):
+                    if expires_at < now:
+                        del self.watchers[key]
+                watched = self.watched_channels()
+                for user_login in list(self.last_status):
+                    if user_login not in watched:
+                        del self.last_status[user_login]
+            await asyncio.sleep(StreamRelayConfig.ANNOUNCE_INTERVAL)
+
+    def watched_channels(self) -> set[str]:
+        now = time.monotonic()
+        watched = set()
+        for channels, expires_at in self.watchers.values():
+            if expires_at >= now:
+                watched |= channels
+        return watched
+
+    async def update_watchers(self, message: dict):
+        channels = set(message["channels"])
+        previous, _ = self.watchers.get(message["worker"], (set(), 0.0))
+        self.watchers[message["worker"]] = (channels, time.monotonic() + StreamRelayConfig.WATCH_TTL)
+
+        new_channels = (channels - previous) | set(message.get("pending", []))
+        for user_login in new_channels:
+            # Bekannten Status erneut senden, damit neue Zuschauer nicht bis zum nächsten Wechsel warten
+            if user_login in self.last_status:
+                await self.send_status(user_login, self.last_status[user_login])
+        if any(user_login not in self.last_status for user_login in new_channels):
+            self.poller.wake()
+
+    async def publish_status(self, user_login: str, stream_data: dict | None):
+        # Nur Statuswechsel veröffentlichen
+        if user_login in self.last_status and bool(self.last_status[user_login]) == bool(stream_data):
+            return
+        self.last_status[user_login] = stream_data
+        await self.send_status(user_login, stream_data)
+
+    async def send_status(self, user_login: str, stream_data: dict | None):
+        payload = json.dumps({"user_login": user_login, "data": stream_data})
+        await self.notify(StreamRelayConfig.STATUS_CHANNEL, payload)
+
+
+stream_relay = PostgresStreamRelay(stream_hub)
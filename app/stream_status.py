@@ -0,0 +1,355 @@
+import json
+import time
+import asyncio
+import hashlib
+from fastapi import WebSocket
+from app.twitch_func import fetch_streams_status, STREAMS_BATCH_SIZE
+from app.utils.time_tracking_logger import logger
+
+# Abstand zwischen zwei Abfragen an Twitch (Sekunden)
+POLL_INTERVAL = 30
+# Nachrichten, die pro WebSocket auf das Senden warten dürfen
+SEND_QUEUE_SIZE = 16
+# Länger darf ein einzelnes send_json nicht hängen (Sekunden)
+SEND_TIMEOUT = 10
+# Close-Code für Clients, die nicht hinterherkommen (1013 = Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# So lange wird ein Channel nach einer HTTP-Abfrage ohne WebSocket weiter abgefragt (Sekunden)
+LEASE_TTL = 120
+# Höchstens so viele Channels werden nur für HTTP-Abfragen beobachtet
+MAX_LEASED_CHANNELS = 500
+
+
+class Subscriber:
+    """
+    Ein WebSocket mit eigener, begrenzter Sendewarteschlange.
+
+    Ein eigener Writer-Task arbeitet die Warteschlange ab, so dass ein
+    langsamer Client nie den Broadcast an die anderen Zuschauer aufhält.
+    """
+
+    def __init__(self, websocket: WebSocket, on_drop):
+        self.websocket = websocket
+        self.on_drop = on_drop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.closed = False
+        self.task = asyncio.create_task(self.writer(), name="stream-status-writer")
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    def send(self, message: dict) -> bool:
+        """Reiht eine Nachricht ein. False, wenn die Warteschlange voll ist."""
+        if self.closed:
+            return True
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def writer(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_json(message), timeout=SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Verbindung ist tot oder hängt
+            self.on_drop(self, f"send failed: {type(e).__name__}")
+
+    def close(self, code: int | None = None):
+        self.closed = True
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+        if code is not None:
+            asyncio.create_task(self.close_websocket(code))
+
+    async def close_websocket(self, code: int):
+        try:
+            await asyncio.wait_for(self.websocket.close(code), timeout=SEND_TIMEOUT)
+        except Exception:
+            pass
+
+
+class ChannelSubscribers:
+    """Zuschauer und zuletzt bekannter Stream-Status eines Channels."""
+
+    def __init__(self, user_login: str):
+        self.user_login = user_login
+        self.subscribers: dict[WebSocket, Subscriber] = {}
+        self.status = None
+        self.data = None
+        self.etag = None
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        # Bis dahin (monotonic) wird der Channel auch ohne Zuschauer abgefragt
+        self.lease_until = 0.0
+
+    @property
+    def leased(self) -> bool:
+        return self.lease_until >= time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return not self.subscribers and not self.leased
+
+    def add(self, websocket: WebSocket):
+        subscriber = Subscriber(websocket, self.drop)
+        self.subscribers[websocket] = subscriber
+        # Neue Zuschauer bekommen sofort den zuletzt bekannten Status
+        if self.status is not None:
+            subscriber.send({"status": self.status, "data": self.data})
+
+    def remove(self, websocket: WebSocket):
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber:
+            subscriber.close()
+
+    def drop(self, subscriber: Subscriber, reason: str, code: int | None = None):
+        """Entfernt einen Zuschauer, dessen Verbindung tot ist oder nicht hinterherkommt."""
+        if self.subscribers.get(subscriber.websocket) is not subscriber:
+            return
+        del self.subscribers[subscriber.websocket]
+        self.dropped += 1
+        logger.info(f"Dropped websocket for {self.user_login}: {reason}")
+        subscriber.close(code)
+
+    def broadcast(self, message: dict):
+        for subscriber in list(self.subscribers.values()):
+            if not subscriber.send(message):
+                self.drop(subscriber, "slow consumer", SLOW_CONSUMER_CLOSE_CODE)
+
+    def update(self, stream_data: dict | None):
+        current_status = "online" if stream_data else "offline"
+        # Nur bei Statuswechsel an alle Zuschauer senden
+        if current_status != self.status:
+            self.status = current_status
+            self.data = stream_data
+            # HTTP liefert nur den Status: Titel und Zuschauerzahl ändern sich ohne Statuswechsel
+            body = json.dumps({"status": current_status})
+            self.etag = '"' + hashlib.sha1(body.encode()).hexdigest()[:16] + '"'
+            self.ready.set()
+            self.broadcast({"status": current_status, "data": stream_data})
+
+    def stats(self) -> dict:
+        depths = [subscriber.queue_depth for subscriber in self.subscribers.values()]
+        return {
+            "subscribers": len(depths),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "dropped": self.dropped,
+            "leased": self.leased,
+            "status": self.status,
+        }
+
+
+class StreamStatusPoller:
+    """
+    Fragt eine wechselnde Menge von Channels gebündelt ab (100 Channels pro
+    Helix-Anfrage) und meldet jedes Ergebnis an on_status weiter.
+
+    Args:
+        watched: Liefert die Channels, die gerade abgefragt werden sollen.
+        on_status: async (user_login, stream_data) -> None
+        on_error: async () -> None, wird nach einem fehlgeschlagenen Durchlauf aufgerufen.
+    """
+
+    def __init__(self, watched, on_status, on_error=None):
+        self.watched = watched
+        self.on_status = on_status
+        self.on_error = on_error
+        self.known: set[str] = set()
+        self.task: asyncio.Task | None = None
+        self.wakeup = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        if not self.running:
+            self.task = asyncio.create_task(self.run(), name="stream-status-poller")
+            logger.info("Stream status poller started")
+
+    async def stop(self):
+        # Task vor dem Warten lösen: ein start() währenddessen legt sonst keinen neuen an
+        task, self.task = self.task, None
+        if task:
+            self.known.clear()
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Stream status poller stopped")
+
+    def wake(self):
+        # Neuer Channel: nicht bis zum nächsten Durchlauf warten
+        self.wakeup.set()
+
+    async def poll(self, user_logins: list[str]) -> bool:
+        """Fragt die Channels in Blöcken zu 100 ab und meldet die Ergebnisse."""
+        chunks = [
+            user_logins[i:i + STREAMS_BATCH_SIZE]
+            for i in range(0, len(user_logins), STREAMS_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(fetch_streams_status(chunk) for chunk in chunks))
+
+        ok = True
+        for result in results:
+            if result is None:
+                ok = False
+                continue
+            for user_login, stream_data in result.items():
+                self.known.add(user_login)
+                await self.on_status(user_login, stream_data)
+        return ok
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        error_count = 0
+        next_tick = 0.0
+
+        while True:
+            self.wakeup.clear()
+            watched = self.watched()
+            self.known.intersection_update(watched)
+
+            if loop.time() >= next_tick:
+                # Regulärer Durchlauf über alle beobachteten Channels
+                user_logins = list(watched)
+                next_tick = loop.time() + POLL_INTERVAL
+            else:
+                # Zwischendurch nur neu hinzugekommene Channels abfragen
+                user_logins = [login for login in watched if login not in self.known]
+
+            if user_logins and await self.poll(user_logins):
+                error_count = 0
+            elif user_logins:
+                error_count += 1
+                logger.info(f"Error in stream status poller ({len(user_logins)} channels)")
+
+                # Exponential backoff (max 60 Sekunden)
+                backoff_time = min(5 * (2 ** (error_count - 1)), 60)
+                next_tick = max(next_tick, loop.time() + backoff_time)
+
+                if self.on_error:
+                    await self.on_error()
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=max(0.0, next_tick - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+
+class StreamStatusHub:
+    """
+    Verwaltet die WebSockets dieses Prozesses pro Channel.
+
+    Ohne Relay fragt der Hub alle lokal beobachteten Channels selbst ab. Mit
+    Relay (siehe app.stream_relay) kommen die Statuswechsel von dem einen
+    gewählten Poller aller Worker, und der Hub verteilt sie nur noch lokal.
+    """
+
+    def __init__(self):
+        self.channels: dict[str, ChannelSubscribers] = {}
+        self.poller = StreamStatusPoller(self.watched_channels, self.deliver, self.heartbeat)
+        self.relay = None
+
+    async def subscribe(self, user_login: str, websocket: WebSocket):
+        channel = self.channels.get(user_login)
+        if channel is None:
+            channel = ChannelSubscribers(user_login)
+            self.channels[user_login] = channel
+            self.channels_changed()
+        channel.add(websocket)
+
+    async def unsubscribe(self, user_login: str, websocket: WebSocket):
+        channel = self.channels.get(user_login)
+        if channel is None:
+            return
+        channel.remove(websocket)
+        if channel.idle:
+            del self.channels[user_login]
+            self.channels_changed()
+        if not self.channels:
+            # Letzter Zuschauer weg: Poller stoppen
+            await self.poller.stop()
+
+    async def lookup(self, user_login: str, timeout: float) -> ChannelSubscribers | None:
+        """
+        Gibt den zwischengespeicherten Status eines Channels zurück (für HTTP).
+        Unbekannte Channels werden für LEASE_TTL Sekunden mit abgefragt; auf
+        den ersten Status wird höchstens timeout Sekunden gewartet.
+        """
+        channel = self.channels.get(user_login)
+        if channel is None:
+            leased = sum(1 for other in self.channels.values() if not other.subscribers)
+            if leased >= MAX_LEASED_CHANNELS:
+                return None
+            channel = ChannelSubscribers(user_login)
+            self.channels[user_login] = channel
+            channel.lease_until = time.monotonic() + LEASE_TTL
+            self.channels_changed()
+        else:
+            channel.lease_until = time.monotonic() + LEASE_TTL
+
+        if channel.status is None:
+            try:
+                await asyncio.wait_for(channel.ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return channel
+
+    def watched_channels(self) -> list[str]:
+        """Alle Channels mit Zuschauern oder gültigem Lease; abgelaufene fallen weg."""
+        for user_login, channel in list(self.channels.items()):
+            if channel.idle:
+                del self.channels[user_login]
+        return list(self.channels)
+
+    def channels_changed(self):
+        if self.relay is not None:
+            self.relay.announce()
+        elif self.channels:
+            self.poller.start()
+            self.poller.wake()
+
+    async def set_relay(self, relay):
+        """Schaltet zwischen lokalem Polling (None) und Relay um."""
+        self.relay = relay
+        if relay is not None:
+            await self.poller.stop()
+        self.channels_changed()
+
+    async def stop(self):
+        await self.poller.stop()
+        for channel in self.channels.values():
+            for subscriber in channel.subscribers.values():
+                subscriber.close()
+
+    def stats(self) -> dict:
+        """Zuschauer und Warteschlangen pro Channel (für die Kapazitätsplanung)."""
+        channels = {user_login: channel.stats() for user_login, channel in self.channels.items()}
+        return {
+            "channels": len(channels),
+            "subscribers": sum(channel["subscribers"] for channel in channels.values()),
+            "queue_size": SEND_QUEUE_SIZE,
+            "per_channel": channels,
+        }
+
+    async def deliver(self, user_login: str, stream_data: dict | None):
+        channel = self.channels.get(user_login)
+        if channel:
+            channel.update(stream_data)
+
+    async def heartbeat(self):
+        # Heartbeat entfernt gleichzeitig tote Verbindungen
+        for channel in list(self.channels.values()):
+            channel.broadcast({"status": "heartbeat"})
+
+
+stream_hub = StreamStatusHub()
@@ -1,21 +1,24 @@
 import os
-import httpx
-import requests
+import asyncio
+from datetime import datetime, timedelta
 from fastapi import HTTPException
 from app.twitch_data import Twitch
+from app.twitch_token import get_app_token
+from app.http_client import get_http_client
+from app.twitch_ratelimit import helix_get, PRIORITY_HIGH, PRIORITY_LOW
 
 class Streamer:
     ID = os.getenv("TWITCH_STREAMER_ID")
     SECRET = os.getenv("TWITCH_STREAMER_SECRET")
 
-def get_user_info(access_token: str):
+async def get_user_info(access_token: str):
     user_info_url = "https://api.twitch.tv/helix/users"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Client-Id": Twitch.CLIENT_ID,
     }
     
-    response = requests.get(user_info_url, headers=headers)
+    response = await get_http_client().get(user_info_url, headers=headers)
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to fetch user info")
     
@@ -47,88 +50,72 @@ def get_user_info(access_token: str):
 
     # return data["data"][0] if response.status_code == 200 and data["data"] else None
 
-async def fetch_stream_status(user_login: str, token: str):
-    url = "https://api.twitch.tv/helix/streams"
-    headers = {
-        "Client-ID": Streamer.ID,
-        "Authorization": f"Bearer {token}",
-    }
-    params = {"user_login": user_login}
+# Helix /streams akzeptiert bis zu 100 user_login Parameter pro Anfrage
+STREAMS_BATCH_SIZE = 100
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:  # Set explicit timeout
-            response = await client.get(url, headers=headers, params=params)
-            data = response.json()
-            
-            return data["data"][0] if response.status_code == 200 and data["data"] else None
-            
-    except httpx.ConnectTimeout:
-        print(f"Connection timeout when fetching stream status for {user_login}")
-        return None
-    except httpx.ReadTimeout:
-        print(f"Read timeout when fetching stream status for {user_login}")
-        return None
-    except Exception as e:
-        print(f"Error fetching stream status for {user_login}: {str(e)}")
-        return None    
-
-# No Login required (dev creds)
-
-# async def get_oauth_token():
-#     url = "https://id.twitch.tv/oauth2/token"
-#     params = {
-#         "client_id": Streamer.ID,  
-#         "client_secret": Streamer.SECRET,
-#         "grant_type": "client_credentials"
-#     }
-
-#     async with httpx.AsyncClient() as client:
-#         response = await client.post(url, params=params)
-#         data = response.json()
-
-#     return data['access_token']  # -> access_token
-async def get_oauth_token():
-    url = "https://id.twitch.tv/oauth2/token"
-    params = {
-        "client_id": Streamer.ID,
-        "client_secret": Streamer.SECRET,
-        "grant_type": "client_credentials"
-    }
+async def fetch_streams_status(user_logins: list[str]):
+    """
+    Fragt den Stream-Status mehrerer Channels mit einer Anfrage ab (max. 100).
+    Bei einem 401 wird das App-Token verworfen und die Anfrage einmal wiederholt.
+
+    Returns:
+        dict | None: user_login -> Stream-Daten (None = offline) für alle
+        angefragten Channels, None bei einem Fehler.
+    """
+    url = "https://api.twitch.tv/helix/streams"
+    params = [("user_login", user_login) for user_login in user_logins]
+    params.append(("first", STREAMS_BATCH_SIZE))
+    app_token = get_app_token(Streamer.ID, Streamer.SECRET)
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, params=params)
-            data = response.json()
-            
-            if response.status_code == 200:
-                return data['access_token']
-            else:
-                print(f"Failed to get OAuth token: {data}")
-                # Return previous token if available, or None
+        for attempt in range(2):
+            token = await app_token.get()
+            if not token:
+                print("Error fetching stream status: no app access token")
                 return None
-                
+
+            response = await helix_get(url, Streamer.ID, token, params=params, priority=PRIORITY_HIGH)
+
+            if response.status_code == 401 and attempt == 0:
+                # Token wurde von Twitch widerrufen: sofort erneuern
+                app_token.invalidate(token)
+                continue
+            break
+
+        if response.status_code != 200:
+            print(f"Error fetching stream status for {len(user_logins)} channels: {response.status_code}")
+            return None
+
+        live = {stream["user_login"].lower(): stream for stream in response.json()["data"]}
+        return {user_login: live.get(user_login.lower()) for user_login in user_logins}
+
     except Exception as e:
-        print(f"Error fetching OAuth token: {str(e)}")
+        print(f"Error fetching stream status for {len(user_logins)} channels: {str(e)}")
         return None
 
-
-def get_clips_from_twitch(broadcaster_id, access_token, limit=10):
+async def get_clips_from_twitch(broadcaster_id, access_token, limit=100, started_at=None, ended_at=None):
     """
     Ruft Clips eines Broadcasters ab und unterstützt die Paginierung.
+
+    Mit started_at/ended_at (datetime, UTC) werden nur Clips aus diesem
+    Zeitraum abgefragt. Gibt None zurück, wenn eine Seite fehlschlägt, damit
+    ein unvollständiges Ergebnis nicht als vollständig behandelt wird.
     """
     url = "https://api.twitch.tv/helix/clips"
-    headers = {
-        "Client-ID": Twitch.CLIENT_ID,
-        "Authorization": f"Bearer {access_token}"
-    }
     params = {
         "broadcaster_id": broadcaster_id,
         "first": limit
     }
+    # Helix erwartet RFC3339; ohne ended_at gilt started_at + 1 Woche
+    if started_at:
+        params["started_at"] = started_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if ended_at:
+        params["ended_at"] = ended_at.strftime("%Y-%m-%dT%H:%M:%SZ")
     clips = []
     
     while True:
-        response = requests.get(url, headers=headers, params=params)
+        # Hintergrundarbeit: wartet, wenn das Budget für den Stream-Status knapp wird
+        response = await helix_get(url, Twitch.CLIENT_ID, access_token, params=params, priority=PRIORITY_LOW)
         
         if response.status_code == 200:
             data = response.json()
@@ -140,59 +127,83 @@ def get_clips_from_twitch(broadcaster_id, access_token, limit=10):
             else:
                 break  # Keine weiteren Seiten, beende die Schleife
         else:
+            if response.status_code == 401:
+                get_app_token(Twitch.CLIENT_ID, Twitch.CLIENT_SECRET).invalidate(access_token)
             print(f"Fehler beim Abrufen der Clips: {response.status_code}")
             print(response.json())
-            break
+            return None
 
     return clips
 
-def get_broadcaster_id(username, access_token):
+# Backfill: Zeitfenster pro Abfrage und gleichzeitig laufende Fenster
+CLIP_WINDOW = timedelta(days=30)
+CLIP_WINDOW_CONCURRENCY = 8
+
+async def get_clip_history_from_twitch(broadcaster_id, access_token, since: datetime, until: datetime):
     """
-    Ruft die Broadcaster-ID eines Benutzernamens ab.
+    Ruft alle Clips zwischen since und until ab, indem der Zeitraum in
+    Fenster (CLIP_WINDOW) geteilt wird, die parallel abgefragt werden. Die
+    Anfragen laufen über das Rate-Limit-Budget; doppelte Clips werden entfernt.
+
+    Returns:
+        list | None: Alle Clips oder None, wenn ein Fenster fehlschlägt.
+    """
+    windows = []
+    start = since
+    while start < until:
+        end = min(start + CLIP_WINDOW, until)
+        windows.append((start, end))
+        start = end
+
+    semaphore = asyncio.Semaphore(CLIP_WINDOW_CONCURRENCY)
+
+    async def fetch_window(started_at, ended_at):
+        async with semaphore:
+            return await get_clips_from_twitch(
+                broadcaster_id, access_token, limit=100, started_at=started_at, ended_at=ended_at
+            )
+
+    results = await asyncio.gather(*(fetch_window(start, end) for start, end in windows))
+    if any(result is None for result in results):
+        return None
+
+    # Clips an Fenstergrenzen können doppelt kommen
+    clips = {}
+    for result in results:
+        for clip in result:
+            clips[clip["id"]] = clip
+    return list(clips.values())
+
+async def get_broadcaster(username, access_token):
+    """
+    Ruft die Benutzerdaten (id, created_at, ...) eines Broadcasters ab.
     """
     url = "https://api.twitch.tv/helix/users"
-    headers = {
-        "Client-ID": Twitch.CLIENT_ID,
-        "Authorization": f"Bearer {access_token}"
-    }
     params = {"login": username}
 
-    response = requests.get(url, headers=headers, params=params)
+    response = await helix_get(url, Twitch.CLIENT_ID, access_token, params=params, priority=PRIORITY_LOW)
 
     if response.status_code == 200:
         data = response.json()
         if data["data"]:
-            return data["data"][0]["id"]
+            return data["data"][0]
         else:
             print("Benutzer nicht gefunden.")
             return None
     else:
+        if response.status_code == 401:
+            get_app_token(Twitch.CLIENT_ID, Twitch.CLIENT_SECRET).invalidate(access_token)
         print(f"Fehler beim Abrufen der Broadcaster-ID: {response.status_code}")
         print(response.json())
         return None
-    
-def generate_access_token():
+
+async def generate_access_token():
     """
-    Generiert ein Access Token mit Hilfe von CLIENT_ID und CLIENT_SECRET.
+    Gibt das App-Access-Token für CLIENT_ID und CLIENT_SECRET zurück (prozessweit gecacht).
     """
-    url = "https://id.twitch.tv/oauth2/token"
-    params = {
-        "client_id": Twitch.CLIENT_ID,
-        "client_secret": Twitch.CLIENT_SECRET,
-        "grant_type": "client_credentials"
-    }
-
-    response = requests.post(url, params=params)
-
-    if response.status_code == 200:
-        data = response.json()
-        return data["access_token"]
-    else:
-        print(f"Fehler beim Abrufen des Access Tokens: {response.status_code}")
-        print(response.json())
-        return None
+    return await get_app_token(Twitch.CLIENT_ID, Twitch.CLIENT_SECRET).get()
     
-def get_access_token(code: str) -> str:
+async def get_access_token(code: str) -> tuple[str, int]:
     """
     Holt das Access Token von Twitch mit dem Authorization Code.
     """
@@ -205,7 +216,7 @@ def get_access_token(code: str) -> str:
         "redirect_uri": Twitch.REDIRECT_URI,
     }
 
-    response = requests.post(token_url, data=data)
+    response = await get_http_client().post(token_url, data=data)
 
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to fetch access token")
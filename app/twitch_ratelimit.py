@@ -0,0 +1,162 @@
+import time
+import asyncio
+import httpx
+from contextvars import ContextVar
+from app.http_client import get_http_client
+from app.utils.time_tracking_logger import logger
+
+# Stream-Status (Zuschauer warten darauf) vor Hintergrundarbeit wie dem Clip-Sync
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+
+
+class RateLimitConfig:
+    # Helix: 800 Punkte pro Minute und Client-ID (wird aus Ratelimit-Limit übernommen)
+    DEFAULT_LIMIT = 800
+    WINDOW = 60
+    # Anteil des Budgets, den Hintergrundarbeit nicht anrühren darf
+    BACKGROUND_RESERVE = 0.2
+    # Wiederholungen nach einem 429
+    MAX_RETRIES = 2
+    # Kürzeste Wartezeit, bevor das Budget erneut geprüft wird (Sekunden)
+    MIN_WAIT = 0.05
+
+
+class HelixRateLimiter:
+    """
+    Token Bucket für die Helix-Punkte einer Client-ID.
+
+    Der Bucket füllt sich mit limit/60 Punkten pro Sekunde und wird mit jeder
+    Antwort an Ratelimit-Remaining / Ratelimit-Reset angeglichen. Anfragen mit
+    niedriger Priorität lassen eine Reserve übrig und warten, solange Anfragen
+    mit hoher Priorität anstehen.
+    """
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.limit = RateLimitConfig.DEFAULT_LIMIT
+        self.tokens = float(self.limit)
+        self.updated_at = time.monotonic()
+        # Bis dahin (monotonic) keine Anfragen, z.B. nach einem 429
+        self.blocked_until = 0.0
+        self.waiting_high = 0
+        self.requests = 0
+        self.throttled = 0
+
+    @property
+    def rate(self) -> float:
+        return self.limit / RateLimitConfig.WINDOW
+
+    @property
+    def reserve(self) -> float:
+        return self.limit * RateLimitConfig.BACKGROUND_RESERVE
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, priority: int) -> float:
+        """Sekunden bis zur nächsten Anfrage mit dieser Priorität, 0 = sofort."""
+        self.refill()
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        needed = 1 if priority == PRIORITY_HIGH else 1 + self.reserve
+        # Hintergrundarbeit lässt wartenden Stream-Abfragen den Vortritt
+        if self.tokens >= needed and (priority == PRIORITY_HIGH or not self.waiting_high):
+            return 0.0
+        return max(RateLimitConfig.MIN_WAIT, (needed - self.tokens) / self.rate)
+
+    async def acquire(self, priority: int = PRIORITY_HIGH):
+        waited = False
+        if priority == PRIORITY_HIGH:
+            self.waiting_high += 1
+        try:
+            while (delay := self.wait_time(priority)) > 0:
+                waited = True
+                await asyncio.sleep(delay)
+            self.tokens -= 1
+            self.requests += 1
+            if waited:
+                self.throttled += 1
+        finally:
+            if priority == PRIORITY_HIGH:
+                self.waiting_high -= 1
+
+    def update(self, response: httpx.Response):
+        """Gleicht den Bucket an die Ratelimit-Header der Antwort an."""
+        headers = response.headers
+        try:
+            if "Ratelimit-Limit" in headers:
+                self.limit = int(headers["Ratelimit-Limit"])
+            if "Ratelimit-Remaining" in headers:
+                self.refill()
+                # Twitch kennt auch die Anfragen anderer Worker: der kleinere Wert gilt
+                self.tokens = min(self.tokens, float(headers["Ratelimit-Remaining"]))
+            if response.status_code == 429 or self.tokens < 1:
+                self.tokens = min(self.tokens, 0.0)
+                # Ratelimit-Reset ist ein Unix-Zeitstempel (Sekunden)
+                reset_in = float(headers.get("Ratelimit-Reset", time.time() + 1)) - time.time()
+                self.blocked_until = time.monotonic() + min(max(reset_in, 0.0), RateLimitConfig.WINDOW)
+        except ValueError:
+            logger.warning(f"Invalid Ratelimit headers from Twitch: {dict(headers)}")
+
+    def stats(self) -> dict:
+        self.refill()
+        return {
+            "limit": self.limit,
+            "remaining": int(self.tokens),
+            "requests": self.requests,
+            "throttled": self.throttled,
+        }
+
+
+class HelixCallCounter:
+    """Zählt die Helix-Anfragen eines Vorgangs (z.B. eines Clip-Syncs), auch über Tasks hinweg."""
+
+    def __init__(self):
+        self.calls = 0
+
+
+helix_call_counter: ContextVar[HelixCallCounter | None] = ContextVar("helix_call_counter", default=None)
+
+
+rate_limiters: dict[str, HelixRateLimiter] = {}
+
+
+def get_rate_limiter(client_id: str) -> HelixRateLimiter:
+    """Gibt den Bucket für diese Client-ID zurück (einer pro Prozess)."""
+    limiter = rate_limiters.get(client_id)
+    if limiter is None:
+        limiter = HelixRateLimiter(client_id)
+        rate_limiters[client_id] = limiter
+    return limiter
+
+
+async def helix_get(url: str, client_id: str, access_token: str, params=None, priority: int = PRIORITY_HIGH) -> httpx.Response:
+    """
+    GET an die Helix-API über den gemeinsamen HTTP-Client, abgerechnet über
+    den Bucket der Client-ID. Nach einem 429 wird bis Ratelimit-Reset gewartet
+    und die Anfrage wiederholt.
+    """
+    limiter = get_rate_limiter(client_id)
+    headers = {
+        "Client-ID": client_id,
+        "Authorization": f"Bearer {access_token}",
+    }
+
+    counter = helix_call_counter.get()
+
+    for attempt in range(RateLimitConfig.MAX_RETRIES + 1):
+        await limiter.acquire(priority)
+        if counter is not None:
+            counter.calls += 1
+        response = await get_http_client().get(url, headers=headers, params=params)
+        limiter.update(response)
+        if response.status_code != 429:
+            break
+        logger.warning(f"Twitch rate limit hit for {url} (attempt {attempt + 1})")
+
+    return response
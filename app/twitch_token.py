@@ -0,0 +1,99 @@
+import time
+import asyncio
+from app.http_client import get_http_client
+from app.utils.time_tracking_logger import logger
+
+TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+# Token so lange vor Ablauf erneuern (Sekunden)
+REFRESH_MARGIN = 300
+# Nach einem fehlgeschlagenen Abruf so lange nicht erneut versuchen (Sekunden)
+RETRY_COOLDOWN = 5
+
+
+class AppAccessToken:
+    """
+    App-Access-Token (client_credentials) für eine Client-ID.
+
+    Das Token wird prozessweit zwischengespeichert und kurz vor Ablauf
+    (expires_in) erneuert. Stellen viele Coroutinen gleichzeitig fest, dass
+    das Token abläuft, wird trotzdem nur ein Abruf bei Twitch gemacht.
+    """
+
+    def __init__(self, client_id: str, client_secret: str):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token: str | None = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.retry_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        return self.token is not None and time.monotonic() < self.refresh_at
+
+    def is_usable(self) -> bool:
+        return self.token is not None and time.monotonic() < self.expires_at
+
+    async def get(self) -> str | None:
+        """Gibt ein gültiges Token zurück und erneuert es bei Bedarf."""
+        if self.is_fresh():
+            return self.token
+
+        async with self.lock:
+            # Ein anderer Aufrufer hat das Token inzwischen erneuert
+            if self.is_fresh():
+                return self.token
+            if time.monotonic() >= self.retry_at:
+                await self.refresh()
+
+        return self.token if self.is_usable() else None
+
+    def invalidate(self, token: str | None = None):
+        """
+        Markiert das Token als ungültig (z.B. nach einem 401). Wird ein Token
+        übergeben, wird nur invalidiert, wenn es noch das aktuelle ist.
+        """
+        if token is not None and token != self.token:
+            return
+        self.token = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.retry_at = 0.0
+
+    async def refresh(self):
+        params = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "client_credentials",
+        }
+        try:
+            response = await get_http_client().post(TOKEN_URL, params=params)
+            data = response.json()
+
+            if response.status_code != 200:
+                logger.warning(f"Failed to get app access token: {data}")
+                self.retry_at = time.monotonic() + RETRY_COOLDOWN
+                return
+
+            now = time.monotonic()
+            expires_in = data["expires_in"]
+            self.token = data["access_token"]
+            self.expires_at = now + expires_in
+            self.refresh_at = now + max(expires_in - REFRESH_MARGIN, expires_in / 2)
+            logger.info(f"App access token refreshed, expires in {expires_in} seconds.")
+
+        except Exception as e:
+            logger.warning(f"Error fetching app access token: {str(e)}")
+            self.retry_at = time.monotonic() + RETRY_COOLDOWN
+
+
+app_tokens: dict[str, AppAccessToken] = {}
+
+
+def get_app_token(client_id: str, client_secret: str) -> AppAccessToken:
+    """Gibt den Token-Cache für diese Client-ID zurück (einer pro Prozess)."""
+    token = app_tokens.get(client_id)
+    if token is None:
+        token = AppAccessToken(client_id, client_secret)
+        app_tokens[client_id] = token
+    return token
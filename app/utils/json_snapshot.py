@@ -0,0 +1,153 @@
+import os
+import gzip
+import time
+import asyncio
+import hashlib
+import orjson
+from fastapi import Request, Response
+from app.utils.response_cache import ResponseCache, clip_list_cache
+from app.utils.time_tracking_logger import logger
+
+
+class JsonSnapshotConfig:
+    GZIP = os.getenv("JSON_SNAPSHOT_GZIP", "true").lower() == "true"
+    GZIP_LEVEL = int(os.getenv("JSON_SNAPSHOT_GZIP_LEVEL", "6"))
+    # Kleinere Antworten lohnen das Komprimieren nicht
+    GZIP_MIN_SIZE = 1024
+    # Höchstens ein Neubau pro Liste in diesem Abstand (Sekunden); dazwischen gilt der alte Snapshot
+    MIN_REBUILD_INTERVAL = float(os.getenv("JSON_SNAPSHOT_MIN_REBUILD_INTERVAL", "2"))
+
+
+def make_etag(body: bytes) -> str:
+    """Starkes ETag aus dem Inhalt (wie ChannelSubscribers.update)."""
+    return '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+
+class JsonSnapshot:
+    """Fertig serialisierte (und ggf. komprimierte) Antwort mit ETag."""
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag", "count", "version", "built_at", "build_ms")
+
+    def __init__(self, items: list, version: int = 0, started: float | None = None):
+        started = started if started is not None else time.perf_counter()
+        # orjson: direkt UTF-8-Bytes, ohne Umweg über str
+        self.body = orjson.dumps(items)
+        self.etag = make_etag(self.body)
+        self.gzip_body = None
+        self.gzip_etag = None
+        if JsonSnapshotConfig.GZIP and len(self.body) >= JsonSnapshotConfig.GZIP_MIN_SIZE:
+            self.gzip_body = gzip.compress(self.body, compresslevel=JsonSnapshotConfig.GZIP_LEVEL)
+            # Eigene Repräsentation, eigenes starkes ETag
+            self.gzip_etag = self.etag[:-1] + '-gzip"'
+        self.count = len(items)
+        self.version = version
+        self.built_at = time.time()
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def response(self, request: Request, cache_control: str, headers: dict | None = None) -> Response:
+        """Antwort mit ETag; 304 ohne Body, wenn If-None-Match passt."""
+        gzipped = self.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", "")
+        etag = self.gzip_etag if gzipped else self.etag
+        headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=self.gzip_body if gzipped else self.body, media_type="application/json", headers=headers)
+
+
+class JsonSnapshotStore:
+    """
+    Hält fertige JSON-Bytes für häufig abgerufene, vollständige Listen.
+
+    Die Snapshots hängen an der Version eines ResponseCache: erhöht eine
+    schreibende Route die Version, wird beim nächsten Abruf neu gebaut.
+    Dazwischen ist ein Abruf nur noch das Ausliefern fertiger Bytes.
+
+    Neu gebaut wird höchstens alle MIN_REBUILD_INTERVAL Sekunden; bis dahin
+    und während eines Neubaus wird der vorherige Snapshot ausgeliefert. So
+    löst nicht jeder Like einen Neubau aus.
+    """
+
+    def __init__(self, name: str, cache: ResponseCache):
+        self.name = name
+        self.cache = cache
+        self.snapshots: dict[tuple, JsonSnapshot] = {}
+        self.lock = asyncio.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.builds = 0
+
+    def current(self, key: tuple) -> JsonSnapshot | None:
+        snapshot = self.snapshots.get(key)
+        # TTL wie beim ResponseCache: Änderungen aus anderen Workern erhöhen die Version hier nicht
+        if (snapshot is not None and snapshot.version == self.cache.version
+                and time.time() - snapshot.built_at < self.cache.ttl):
+            return snapshot
+        return None
+
+    def servable(self, key: tuple) -> JsonSnapshot | None:
+        """Veralteter Snapshot, der noch ausgeliefert werden darf (Neubau läuft oder ist zu früh)."""
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None and (
+            self.lock.locked() or time.time() - snapshot.built_at < JsonSnapshotConfig.MIN_REBUILD_INTERVAL
+        ):
+            return snapshot
+        return None
+
+    async def get(self, key: tuple, build) -> JsonSnapshot:
+        """Gibt den aktuellen Snapshot zurück oder baut ihn mit await build() (Liste von Dicts)."""
+        snapshot = self.current(key)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        snapshot = self.servable(key)
+        if snapshot is not None:
+            self.stale_hits += 1
+            return snapshot
+
+        # Gleichzeitige Anfragen ohne Snapshot warten auf denselben Neubau
+        async with self.lock:
+            snapshot = self.current(key)
+            if snapshot is None:
+                return await self.build(key, build)
+        self.hits += 1
+        return snapshot
+
+    async def build(self, key: tuple, build) -> JsonSnapshot:
+        version = self.cache.version
+        started = time.perf_counter()
+        items = await build()
+        # Encoding und gzip im Threadpool: blockiert bei großen Listen sonst den Event-Loop
+        snapshot = await asyncio.to_thread(JsonSnapshot, items, version, started)
+        self.builds += 1
+        # Auch wenn währenddessen geschrieben wurde: neuer als der bisherige Snapshot.
+        # Mit der alten Version gilt er als veraltet und wird nach MIN_REBUILD_INTERVAL ersetzt.
+        self.snapshots[key] = snapshot
+        logger.info(
+            f"JSON-Snapshot {self.name}{key}: {snapshot.count} Einträge, {len(snapshot.body)} Bytes "
+            f"(gzip: {len(snapshot.gzip_body) if snapshot.gzip_body else '-'}) in {snapshot.build_ms} ms"
+        )
+        return snapshot
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "builds": self.builds,
+            "snapshots": {
+                str(key): {
+                    "count": snapshot.count,
+                    "bytes": len(snapshot.body),
+                    "gzip_bytes": len(snapshot.gzip_body) if snapshot.gzip_body else None,
+                    "build_ms": snapshot.build_ms,
+                    "current": snapshot.version == self.cache.version,
+                }
+                for key, snapshot in self.snapshots.items()
+            },
+        }
+
+
+# Vollständige /clip/all-Liste (mit und ohne blockierte Clips, je Sortierung)
+clip_snapshots = JsonSnapshotStore("clip_list", clip_list_cache)
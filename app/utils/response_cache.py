@@ -0,0 +1,95 @@
+import os
+import time
+from collections import OrderedDict
+
+
+class ResponseCacheConfig:
+    # Obergrenze für veraltete Antworten in anderen Workern (dort wird die Version nicht erhöht)
+    TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    # Ein Eintrag pro Benutzer und Seite: eigene Obergrenze für /clip/my_liked_clips
+    LIKED_CLIPS_MAX_ENTRIES = int(os.getenv("LIKED_CLIPS_CACHE_MAX_ENTRIES", "1024"))
+
+
+MISSING = object()
+
+
+class ResponseCache:
+    """
+    Prozessinterner Cache für fertige Antworten, Schlüssel = Route + Query-Parameter.
+
+    Schreibende Routen erhöhen nach dem Commit die Version (bump); alle
+    Einträge älterer Versionen sind damit ungültig. Zusätzlich verfallen
+    Einträge nach TTL Sekunden und werden per LRU verdrängt.
+    """
+
+    def __init__(self, name: str, ttl: int = ResponseCacheConfig.TTL, max_entries: int = ResponseCacheConfig.MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, tuple[int, float, object]] = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        entry = self.entries.get(key)
+        if entry is not None:
+            version, expires_at, value = entry
+            if version == self.version and expires_at > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return MISSING
+
+    def set(self, key: tuple, value, version: int):
+        # Während des Aufbaus wurde geschrieben: Ergebnis könnte veraltet sein
+        if version != self.version:
+            return
+        self.entries[key] = (version, time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_build(self, key: tuple, build):
+        """Gibt den Eintrag zurück oder baut ihn mit await build() neu auf."""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        version = self.version
+        value = await build()
+        self.set(key, value, version)
+        return value
+
+    def bump(self):
+        """Nach einem Commit aufrufen, der die gecachten Daten ändert."""
+        self.version += 1
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+# /clip/all (Likes, Blockierungen, Sync)
+clip_list_cache = ResponseCache("clip_list")
+# /clip/my_liked_clips pro Benutzer (Likes, Sync); eigener LRU, damit viele Benutzer
+# die öffentlichen Listen nicht verdrängen
+liked_clips_cache = ResponseCache("liked_clips", max_entries=ResponseCacheConfig.LIKED_CLIPS_MAX_ENTRIES)
+# /challenge/all (alle Challenge-Routen, die schreiben)
+challenge_list_cache = ResponseCache("challenge_list")
+
+
+def response_cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in (clip_list_cache, liked_clips_cache, challenge_list_cache)}
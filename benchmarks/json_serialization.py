@@ -0,0 +1,143 @@
+"""
+Vergleicht die Serialisierung großer Listen-Antworten (p50/p99 in ms):
+
+- pydantic: Modelle pro Zeile, jsonable_encoder, json.dumps (bisheriger Weg
+  über response_model und JSONResponse)
+- json: fertige Dicts, json.dumps
+- orjson: fertige Dicts, orjson.dumps (ORJSONResponse und JsonSnapshot)
+
+Aufruf: python -m benchmarks.json_serialization [Zeilen ...]
+"""
+import sys
+import json
+import time
+import statistics
+from datetime import datetime, timedelta
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+ROW_COUNTS = (1_000, 10_000, 100_000)
+# Weniger Wiederholungen bei großen Listen; p99 ist dort praktisch das Maximum
+REPEATS = {1_000: 100, 10_000: 30, 100_000: 10}
+
+
+# Wie ClipResponse und ChallengeResponse (app/routes), hier ohne App-Import und Umgebungsvariablen
+class Clip(BaseModel):
+    id: str
+    creator_name: str
+    view_count: int
+    created_at: str
+    likes: int
+    thumbnail_url: str | None
+    blocked: bool | None
+
+
+class SubItem(BaseModel):
+    id: str
+    text: str
+    completed: bool
+
+
+class Item(BaseModel):
+    id: str
+    text: str
+    completed: bool
+    subchallenges: list[SubItem]
+
+
+class Section(BaseModel):
+    id: str
+    title: str
+    items: list[Item]
+
+
+class Header(BaseModel):
+    title: str
+    description: str
+    created_at: str
+    challange_end: str
+
+
+class Challenge(BaseModel):
+    id: str
+    header: Header
+    sections: list[Section]
+
+
+def clip_rows(count: int) -> list[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": f"AbcDefGhiJklMnoPqr-{i:08d}",
+            "creator_name": f"creator{i % 500}",
+            "view_count": i * 7 % 100_000,
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+            "likes": i % 300,
+            "thumbnail_url": f"https://clips-media-assets2.twitch.tv/AT-cm%7C{i}-preview-480x272.jpg",
+            "blocked": None,
+        }
+        for i in range(count)
+    ]
+
+
+def challenge_rows(count: int) -> list[dict]:
+    """count Unterziele: je Item eins, 25 Items pro Section, 4 Sections pro Challenge."""
+    challenges = []
+    for c in range(max(count // 100, 1)):
+        sections = []
+        for s in range(4):
+            items = []
+            for i in range(25):
+                item_id = (c * 4 + s) * 25 + i
+                items.append({
+                    "id": str(item_id),
+                    "text": f"Aufgabe {item_id}",
+                    "completed": item_id % 2 == 0,
+                    "subchallenges": [{"id": str(item_id), "text": f"Unterziel {item_id}", "completed": False}],
+                })
+            sections.append({"id": str(c * 4 + s), "title": f"Section {s}", "items": items})
+        challenges.append({
+            "id": str(c),
+            "header": {"title": f"Challenge {c}", "description": "Beschreibung", "created_at": "2024-01-01", "challange_end": "2024-02-01"},
+            "sections": sections,
+        })
+    return challenges
+
+
+def encode_pydantic(model: type[BaseModel], rows: list[dict]) -> bytes:
+    return json.dumps(jsonable_encoder([model(**row) for row in rows]), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_json(rows: list[dict]) -> bytes:
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def measure(encode, repeats: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        encode()
+        timings.append((time.perf_counter() - started) * 1000)
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return statistics.median(timings), percentiles[98]
+
+
+def main(row_counts: tuple[int, ...]):
+    print(f"{'Daten':<10} {'Zeilen':>8} {'Weg':<9} {'p50 ms':>9} {'p99 ms':>9} {'Faktor':>7}")
+    for name, build, model in (("clips", clip_rows, Clip), ("challenges", challenge_rows, Challenge)):
+        for count in row_counts:
+            rows = build(count)
+            repeats = REPEATS.get(count, 10)
+            results = {
+                "pydantic": measure(lambda: encode_pydantic(model, rows), repeats),
+                "json": measure(lambda: encode_json(rows), repeats),
+                "orjson": measure(lambda: orjson.dumps(rows), repeats),
+            }
+            baseline = results["pydantic"][0]
+            for path, (p50, p99) in results.items():
+                print(f"{name:<10} {count:>8} {path:<9} {p50:>9.2f} {p99:>9.2f} {baseline / p50:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or ROW_COUNTS)
@@ -0,0 +1,7 @@
+import os
+
+# Die App liest ihre Konfiguration beim Import; für die Tests reichen Platzhalter
+os.environ.setdefault("PROD_REDIRECT_URL_AFTER_LOGIN", "http://localhost/")
+os.environ.setdefault("JWT_TOKEN_SECRET", "test-secret-with-at-least-32-bytes!!")
+os.environ.setdefault("PROD_CLIENT_ID", "test-client-id")
+os.environ.setdefault("PROD_CLIENT_SECRET", "test-client-secret")
@@ -0,0 +1,70 @@
+import time
+import asyncio
+from types import SimpleNamespace
+import httpx
+import app.main as main
+from app import http_client
+
+# Wie lange Twitch im Test für den Token-Austausch braucht (Sekunden)
+SLOW_CALLBACK = 1.0
+# Obergrenze für GET / während des Callbacks
+MAX_ROOT_LATENCY = 0.2
+
+
+async def slow_twitch(request: httpx.Request) -> httpx.Response:
+    """Antwortet wie Twitch, aber langsam; get_access_token und get_user_info laufen echt."""
+    if request.url.host == "id.twitch.tv":
+        await asyncio.sleep(SLOW_CALLBACK)
+        return httpx.Response(200, json={"access_token": "access-token", "expires_in": 3600})
+    return httpx.Response(200, json={"data": [{
+        "id": "1",
+        "login": "test",
+        "display_name": "Test",
+        "profile_image_url": None,
+        "description": "",
+        "created_at": "2024-01-01T00:00:00Z",
+    }]})
+
+
+async def save_or_update_user(user_info: dict, db):
+    return SimpleNamespace(id=1, display_name=user_info["display_name"])
+
+
+async def get_db():
+    yield None
+
+
+async def measure_root_during_callback() -> tuple[list[float], bool, int]:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        callback = asyncio.create_task(client.get("/auth/callback", params={"code": "abc"}))
+        await asyncio.sleep(0.1)
+
+        latencies = []
+        for _ in range(20):
+            started = time.perf_counter()
+            response = await client.get("/")
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+        in_flight = not callback.done()
+
+        callback_response = await callback
+    await http_client.close_http_client()
+    return latencies, in_flight, callback_response.status_code
+
+
+def test_root_is_not_blocked_by_slow_callback(monkeypatch):
+    # Die Verzögerung steckt im Transport des gemeinsamen HTTP-Clients
+    monkeypatch.setattr(http_client, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(slow_twitch)))
+    # Ohne Postgres im Test: nur das Speichern des Benutzers ist ersetzt
+    monkeypatch.setattr(main, "save_or_update_user", save_or_update_user)
+    main.app.dependency_overrides[main.get_db] = get_db
+    try:
+        latencies, in_flight, callback_status = asyncio.run(measure_root_during_callback())
+    finally:
+        main.app.dependency_overrides.clear()
+
+    # Alle Anfragen an / wurden beantwortet, während der Callback noch lief
+    assert in_flight
+    assert max(latencies) < MAX_ROOT_LATENCY
+    assert callback_status == 307
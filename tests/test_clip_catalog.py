@@ -0,0 +1,67 @@
+import time
+import asyncio
+from datetime import datetime, timedelta
+from app.clip_catalog import ClipCatalog, ClipRecord, BYTES_PER_CLIP, BYTES_PER_SORT
+
+
+def test_expired_catalogue_is_loaded_once_for_concurrent_requests():
+    catalog = ClipCatalog()
+    loads = []
+
+    async def load(db):
+        loads.append(db)
+        await asyncio.sleep(0.05)
+        catalog.loaded_at = time.monotonic()
+        catalog.stale = False
+
+    catalog.load = load
+
+    async def requests():
+        await asyncio.gather(*(catalog.ensure_loaded(None) for _ in range(20)))
+
+    asyncio.run(requests())
+    assert len(loads) == 1
+
+
+def make_catalog(count: int) -> ClipCatalog:
+    catalog = ClipCatalog()
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        record = ClipRecord(
+            i,
+            f"AbcDefGhiJklMnoPqr-{i:08d}-xYz12345AbcDe",
+            f"creator{i % 500}",
+            i * 7 % 100_000,
+            start + timedelta(minutes=i),
+            i % 300,
+            f"https://clips-media-assets2.twitch.tv/AT-cm%7C{i:010d}-preview-480x272.jpg",
+            i % 50 == 0,
+        )
+        catalog.records[record.id] = record
+        catalog.by_clip_id[record.clip_id] = record
+    return catalog
+
+
+def test_like_keeps_likes_order_sorted():
+    catalog = make_catalog(1_000)
+    keys, records = catalog.order("likes")
+
+    for i in range(0, 1_000, 37):
+        record = catalog.records[i]
+        catalog.set_likes(record.clip_id, record.likes + 500 + i)
+
+    # Dieselbe Liste, kein Neuaufbau
+    assert catalog.orders["likes"][0] is keys
+    expected = sorted(catalog.records.values(), key=lambda record: (record.likes, record.id))
+    assert records == expected
+    assert keys == [(record.likes, record.id) for record in expected]
+
+
+def test_memory_per_clip_stays_within_documented_bound():
+    catalog = make_catalog(10_000)
+    bytes_per_clip = catalog.stats()["bytes_per_clip"]
+    assert 300 < bytes_per_clip <= BYTES_PER_CLIP
+
+    for sort in ("likes", "view_count", "created_at"):
+        catalog.order(sort)
+    assert catalog.stats()["bytes_per_clip"] <= BYTES_PER_CLIP + 3 * BYTES_PER_SORT
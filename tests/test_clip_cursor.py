@@ -0,0 +1,67 @@
+import time
+import asyncio
+from types import SimpleNamespace
+from datetime import datetime
+from app.routes import clip
+from app.clip_catalog import ClipCatalog, ClipRecord
+from app.utils.pagination import encode_cursor
+
+
+def make_catalog() -> ClipCatalog:
+    catalog = ClipCatalog()
+    for i in range(1, 6):
+        record = ClipRecord(i, f"c{i}", "creator", i, datetime(2024, 1, i, 12), i, None, False)
+        catalog.records[record.id] = record
+        catalog.by_clip_id[record.clip_id] = record
+    catalog.loaded_at = time.monotonic()
+    catalog.stale = False
+    return catalog
+
+
+def test_cursor_with_timezone_is_normalized_to_naive_utc():
+    assert clip.parse_sort_value("created_at", "2024-01-03T14:00:00+02:00") == datetime(2024, 1, 3, 12)
+    assert clip.parse_sort_value("created_at", "2024-01-03T12:00:00") == datetime(2024, 1, 3, 12)
+
+
+def test_catalogue_page_after_timezone_aware_cursor(monkeypatch):
+    monkeypatch.setattr(clip, "clip_catalog", make_catalog())
+    cursor = encode_cursor(["2024-01-03T12:00:00+00:00", 3])
+
+    result, next_cursor = asyncio.run(clip.build_clip_list_from_catalog(None, False, "created_at", 10, cursor))
+
+    assert [row["id"] for row in result] == ["c2", "c1"]
+    assert next_cursor is None
+
+
+class CapturingSession:
+    """Merkt sich die Abfragen und liefert vorbereitete Zeilen."""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement))
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def liked_row(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        clip_id=f"c{i}", creator_name="creator", view_count=i, created_at=datetime(2024, 1, i),
+        likes=i, thumbnail_url=None, liked_at=datetime(2024, 2, 10 - i), like_id=100 + i,
+    )
+
+
+def test_liked_clips_pages_in_liked_order_by_default():
+    full = CapturingSession([liked_row(1), liked_row(2), liked_row(3)])
+    paged = CapturingSession([liked_row(1), liked_row(2), liked_row(3)])
+
+    asyncio.run(clip.build_liked_clip_list(full, 1, None, None, None))
+    _, next_cursor = asyncio.run(clip.build_liked_clip_list(paged, 1, None, 2, encode_cursor(["2024-02-09T00:00:00", 101])))
+
+    # Mit und ohne limit dieselbe Reihenfolge: zuletzt geliked zuerst
+    order = "ORDER BY user_clip_likes.liked_at DESC, user_clip_likes.id DESC"
+    assert order in full.statements[0]
+    assert order in paged.statements[0]
+    assert "(user_clip_likes.liked_at, user_clip_likes.id) <" in paged.statements[0]
+    assert next_cursor == encode_cursor(["2024-02-08T00:00:00", 102])
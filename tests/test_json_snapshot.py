@@ -0,0 +1,48 @@
+import asyncio
+import orjson
+from app.utils.json_snapshot import JsonSnapshotConfig, JsonSnapshotStore
+from app.utils.response_cache import ResponseCache
+
+
+def test_writes_rebuild_at_most_once_per_interval(monkeypatch):
+    monkeypatch.setattr(JsonSnapshotConfig, "MIN_REBUILD_INTERVAL", 60)
+    cache = ResponseCache("test")
+    store = JsonSnapshotStore("test", cache)
+    builds = []
+
+    async def build():
+        builds.append(cache.version)
+        return [{"likes": cache.version}]
+
+    async def like_storm():
+        first = await store.get(("all",), build)
+        served = []
+        for _ in range(50):
+            cache.bump()
+            served.append(await store.get(("all",), build))
+        return first, served
+
+    first, served = asyncio.run(like_storm())
+
+    assert builds == [0]
+    # Bis zum nächsten erlaubten Neubau wird der vorherige Snapshot ausgeliefert
+    assert all(snapshot is first for snapshot in served)
+    assert store.stale_hits == 50
+
+
+def test_rebuilds_after_interval(monkeypatch):
+    monkeypatch.setattr(JsonSnapshotConfig, "MIN_REBUILD_INTERVAL", 0)
+    cache = ResponseCache("test")
+    store = JsonSnapshotStore("test", cache)
+
+    async def build():
+        return [{"likes": cache.version}]
+
+    async def run():
+        await store.get(("all",), build)
+        cache.bump()
+        return await store.get(("all",), build)
+
+    snapshot = asyncio.run(run())
+    assert orjson.loads(snapshot.body) == [{"likes": 1}]
+    assert store.builds == 2
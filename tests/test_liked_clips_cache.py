@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import app.main as main
+from app.routes import clip
+from app.utils.json_snapshot import JsonSnapshot
+from app.utils.response_cache import ResponseCache
+
+
+class CountingSession:
+    """Zählt die Abfragen, die die Route an die Datenbank stellt."""
+
+    def __init__(self):
+        self.queries = 0
+
+    async def scalar(self, statement):
+        self.queries += 1
+        return SimpleNamespace(id=1, display_name="Test", twitch_id="1")
+
+
+async def fetch_twice(bump=None) -> tuple[httpx.Response, httpx.Response]:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get("/clip/my_liked_clips")
+        if bump:
+            bump()
+        second = await client.get("/clip/my_liked_clips", headers={"If-None-Match": first.headers["etag"]})
+    return first, second
+
+
+def run_with_session(monkeypatch, bump=None):
+    session = CountingSession()
+    builds = []
+
+    async def build_liked_clip_list(db, user_id, sort, limit, cursor):
+        builds.append(user_id)
+        return JsonSnapshot([{"id": "c1", "likes": 1}]), None
+
+    async def get_db():
+        yield session
+
+    cache = ResponseCache("liked_clips")
+    monkeypatch.setattr(clip, "liked_clips_cache", cache)
+    monkeypatch.setattr(clip, "build_liked_clip_list", build_liked_clip_list)
+    main.app.dependency_overrides[clip.get_db] = get_db
+    main.app.dependency_overrides[clip.get_current_user] = lambda: {"user_id": 1, "display_name": "Test"}
+    try:
+        first, second = asyncio.run(fetch_twice(bump and (lambda: bump(cache))))
+    finally:
+        main.app.dependency_overrides.clear()
+    return session, builds, first, second
+
+
+def test_cached_list_answers_if_none_match_without_query(monkeypatch):
+    session, builds, first, second = run_with_session(monkeypatch)
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    # Nur der erste Abruf fragt die Datenbank
+    assert session.queries == 1
+    assert builds == [1]
+
+
+def test_like_rebuilds_cached_list(monkeypatch):
+    session, builds, first, second = run_with_session(monkeypatch, bump=ResponseCache.bump)
+
+    # Gleicher Inhalt, also weiterhin 304, aber neu aus der Datenbank gelesen
+    assert second.status_code == 304
+    assert session.queries == 2
+    assert builds == [1, 1]
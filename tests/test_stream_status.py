@@ -0,0 +1,68 @@
+import asyncio
+import httpx
+import app.main as main
+from app import stream_status
+from app.stream_status import StreamStatusHub, ChannelSubscribers
+
+
+class FakeWebSocket:
+    async def send_json(self, message: dict):
+        pass
+
+    async def close(self, code: int):
+        pass
+
+
+async def resubscribe_while_stopping() -> tuple[list[str], bool]:
+    hub = StreamStatusHub()
+    first = FakeWebSocket()
+    await hub.subscribe("chan", first)
+    await asyncio.sleep(0.01)
+
+    # Letzter Zuschauer geht, während ein anderer Channel dazukommt
+    await asyncio.gather(hub.unsubscribe("chan", first), hub.subscribe("other", FakeWebSocket()))
+    await asyncio.sleep(0.01)
+
+    running = hub.poller.running
+    await hub.stop()
+    return list(hub.channels), running
+
+
+def test_subscribe_during_poller_stop_keeps_polling(monkeypatch):
+    polled = []
+
+    async def fetch_streams_status(user_logins: list[str]):
+        polled.extend(user_logins)
+        return {user_login: None for user_login in user_logins}
+
+    monkeypatch.setattr(stream_status, "fetch_streams_status", fetch_streams_status)
+    channels, running = asyncio.run(resubscribe_while_stopping())
+
+    assert channels == ["other"]
+    assert running
+    assert "other" in polled
+
+
+async def get_stream_after_update(channel: ChannelSubscribers) -> tuple[httpx.Response, httpx.Response]:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        channel.update({"title": "A", "viewer_count": 10})
+        first = await client.get("/stream/chan")
+        # Gleicher Status, andere Daten: kein Statuswechsel
+        channel.update({"title": "B", "viewer_count": 20})
+        second = await client.get("/stream/chan")
+    return first, second
+
+
+def test_stream_endpoint_serves_status_only(monkeypatch):
+    channel = ChannelSubscribers("chan")
+
+    async def lookup(user_login: str, timeout: float):
+        return channel
+
+    monkeypatch.setattr(main.stream_hub, "lookup", lookup)
+    first, second = asyncio.run(get_stream_after_update(channel))
+
+    # Was gecacht wird, kann nicht veralten
+    assert first.json() == second.json() == {"status": "online"}
+    assert first.headers["etag"] == second.headers["etag"]